@@ -0,0 +1,143 @@
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+from peluqueria.api.db.db_connect import db
+from peluqueria.api.utils.appointment_utils import (
+    resolve_names_stages,
+    resolve_schedule_stages,
+)
+
+logger = logging.getLogger(__name__)
+
+JOB_ID = "backfill_appointment_names"
+
+BACKFILLED_FIELDS = (
+    "user_name",
+    "employee_name",
+    "service_names",
+    "appointment_date",
+    "end_date",
+    "total_duration_minutes",
+)
+
+MISSING_FIELDS_FILTER = {
+    "$or": [
+        {"user_name": {"$in": [None, ""]}},
+        {"employee_name": {"$in": [None, ""]}},
+        {"service_names": {"$in": [None, []]}},
+        {"end_date": None},
+        {"total_duration_minutes": None},
+        # Fechas guardadas como texto: $gt con una fecha nunca las encuentra
+        # y la paginación por keyset se detendría antes de tiempo
+        {"appointment_date": {"$type": "string"}},
+    ]
+}
+
+
+async def backfill_appointment_names(
+    batch_size: int = 500,
+    restart: bool = False,
+) -> int:
+    """Persiste los nombres desnormalizados y el horario faltantes en las citas.
+
+    El horario (end_date y total_duration_minutes) se calcula con la duración
+    actual de los servicios de cada cita.
+
+    El avance se guarda en la colección ``jobs`` después de cada lote, por lo
+    que una ejecución interrumpida continúa desde la última cita procesada.
+    """
+    checkpoint = None if restart else await db.jobs.find_one({"_id": JOB_ID})
+    last_id = checkpoint["last_id"] if checkpoint else None
+    processed = checkpoint.get("processed", 0) if checkpoint else 0
+    repaired = 0
+
+    if last_id is not None:
+        logger.info("Reanudando backfill después de la cita %s", last_id)
+
+    while True:
+        match = MISSING_FIELDS_FILTER
+        if last_id is not None:
+            match = {"$and": [MISSING_FIELDS_FILTER, {"_id": {"$gt": last_id}}]}
+
+        cursor = await db.appointments.aggregate(
+            [
+                {"$match": match},
+                {"$sort": {"_id": 1}},
+                {"$limit": batch_size},
+                *resolve_names_stages(),
+                *resolve_schedule_stages(),
+                {"$project": {field: 1 for field in BACKFILLED_FIELDS}},
+            ]
+        )
+        batch = await cursor.to_list(length=None)
+        if not batch:
+            break
+
+        result = await db.appointments.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": {field: doc[field] for field in BACKFILLED_FIELDS}},
+                )
+                for doc in batch
+            ],
+            ordered=False,
+        )
+
+        last_id = batch[-1]["_id"]
+        processed += len(batch)
+        repaired += result.modified_count
+        await db.jobs.update_one(
+            {"_id": JOB_ID},
+            {
+                "$set": {
+                    "last_id": last_id,
+                    "processed": processed,
+                    "updated_at": datetime.now(timezone.utc),
+                }
+            },
+            upsert=True,
+        )
+        logger.info(
+            "Backfill: %s citas procesadas, %s reparadas (última %s)",
+            processed,
+            repaired,
+            last_id,
+        )
+
+    await db.jobs.delete_one({"_id": JOB_ID})
+    logger.info("Backfill terminado: %s citas reparadas", repaired)
+    return repaired
+
+
+async def ensure_backfill() -> None:
+    """Completa al iniciar las citas antiguas, que GET /appointments no puede devolver."""
+    if await db.appointments.find_one(MISSING_FIELDS_FILTER, {"_id": 1}):
+        await backfill_appointment_names()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Completa user_name, employee_name, service_names, end_date y "
+            "total_duration_minutes en las citas."
+        ),
+    )
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignora el punto de control guardado y recorre toda la colección.",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(backfill_appointment_names(args.batch_size, args.restart))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import argparse
+import asyncio
+import logging
+
+from bson import ObjectId
+
+from peluqueria.api.db.db_connect import db
+
+logger = logging.getLogger(__name__)
+
+IDENTITY_COLLECTION = "identities"
+
+# El email es el _id de la identidad, así que el índice _id garantiza que un
+# email pertenezca a una sola cuenta entre users y employees.
+ACCOUNT_COLLECTIONS = ("users", "employees")
+
+
+async def reserve_identity(email: str, collection: str, user_id: ObjectId) -> None:
+    """Registra el email; lanza DuplicateKeyError si ya pertenece a otra cuenta."""
+    await db[IDENTITY_COLLECTION].insert_one(
+        {"_id": email, "collection": collection, "user_id": user_id}
+    )
+
+
+async def release_identity(email: str) -> None:
+    await db[IDENTITY_COLLECTION].delete_one({"_id": email})
+
+
+def _account_lookup(collection: str) -> dict:
+    return {
+        "$lookup": {
+            "from": collection,
+            "let": {
+                "user_id": {
+                    "$cond": [{"$eq": ["$collection", collection]}, "$user_id", None]
+                }
+            },
+            "pipeline": [{"$match": {"$expr": {"$eq": ["$_id", "$$user_id"]}}}],
+            "as": collection,
+        }
+    }
+
+
+async def find_account_by_email(email: str) -> dict | None:
+    """Busca la cuenta de un email en users o employees en una sola consulta."""
+    cursor = await db[IDENTITY_COLLECTION].aggregate(
+        [
+            {"$match": {"_id": email}},
+            *[_account_lookup(collection) for collection in ACCOUNT_COLLECTIONS],
+            {
+                "$replaceWith": {
+                    "$ifNull": [
+                        {
+                            "$first": {
+                                "$concatArrays": [
+                                    f"${collection}"
+                                    for collection in ACCOUNT_COLLECTIONS
+                                ]
+                            }
+                        },
+                        {},
+                    ]
+                }
+            },
+        ]
+    )
+    accounts = await cursor.to_list(length=1)
+    return accounts[0] if accounts and accounts[0] else None
+
+
+def _rebuild_pipeline() -> list[dict]:
+    def identities_of(collection: str) -> list[dict]:
+        return [
+            {"$match": {"email": {"$type": "string"}}},
+            {
+                "$project": {
+                    "_id": 0,
+                    "email": 1,
+                    "collection": collection,
+                    "user_id": "$_id",
+                }
+            },
+        ]
+
+    first, *others = ACCOUNT_COLLECTIONS
+    return [
+        *identities_of(first),
+        *[
+            {"$unionWith": {"coll": collection, "pipeline": identities_of(collection)}}
+            for collection in others
+        ],
+        # Si un email está repetido entre colecciones se conserva el primero
+        {
+            "$group": {
+                "_id": "$email",
+                "collection": {"$first": "$collection"},
+                "user_id": {"$first": "$user_id"},
+                "accounts": {"$sum": 1},
+            }
+        },
+        {"$out": IDENTITY_COLLECTION},
+    ]
+
+
+async def rebuild_identities() -> None:
+    """Recalcula las identidades desde users y employees; $out reemplaza la colección."""
+    logger.info("Recalculando %s desde %s", IDENTITY_COLLECTION, ACCOUNT_COLLECTIONS)
+    cursor = await db[ACCOUNT_COLLECTIONS[0]].aggregate(_rebuild_pipeline())
+    await cursor.to_list(length=None)
+
+    duplicated = await db[IDENTITY_COLLECTION].count_documents({"accounts": {"$gt": 1}})
+    if duplicated:
+        logger.warning("%s emails están registrados en más de una cuenta", duplicated)
+    await db[IDENTITY_COLLECTION].update_many({}, {"$unset": {"accounts": ""}})
+
+    total = await db[IDENTITY_COLLECTION].count_documents({})
+    logger.info("Identidades recalculadas: %s documentos", total)
+
+
+async def ensure_identities() -> None:
+    if await db[IDENTITY_COLLECTION].estimated_document_count():
+        return
+    for collection in ACCOUNT_COLLECTIONS:
+        if await db[collection].estimated_document_count():
+            await rebuild_identities()
+            return
+
+
+def main() -> None:
+    argparse.ArgumentParser(
+        description=f"Recalcula la colección {IDENTITY_COLLECTION} desde cero.",
+    ).parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(rebuild_identities())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import argparse
+import asyncio
+import logging
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from peluqueria.api.db.db_connect import db
+
+logger = logging.getLogger(__name__)
+
+# Registro declarativo de índices por colección. Los nombres se dejan por
+# defecto (campo_dirección) para coincidir con los índices ya creados.
+INDEX_REGISTRY: dict[str, list[dict]] = {
+    "users": [
+        {"keys": [("email", ASCENDING)], "unique": True},
+        {"keys": [("role", ASCENDING), ("_id", ASCENDING)]},
+        # Conteo de clientes activos del dashboard (account_counts)
+        {"keys": [("role", ASCENDING), ("is_active", ASCENDING)]},
+    ],
+    "employees": [
+        {"keys": [("email", ASCENDING)], "unique": True},
+        {"keys": [("role", ASCENDING), ("_id", ASCENDING)]},
+    ],
+    "services": [
+        {"keys": [("name", ASCENDING)], "unique": True},
+    ],
+    "appointments": [
+        {"keys": [("appointment_date", ASCENDING), ("_id", ASCENDING)]},
+        {
+            "keys": [
+                ("state", ASCENDING),
+                ("appointment_date", ASCENDING),
+                ("_id", ASCENDING),
+            ]
+        },
+        {
+            "keys": [
+                ("employee_id", ASCENDING),
+                ("appointment_date", ASCENDING),
+                ("_id", ASCENDING),
+            ]
+        },
+        # Citas de un empleado que se cruzan con un intervalo (overlapping_query)
+        {
+            "keys": [
+                ("employee_id", ASCENDING),
+                ("appointment_date", ASCENDING),
+                ("end_date", ASCENDING),
+            ]
+        },
+        {
+            "keys": [
+                ("user_id", ASCENDING),
+                ("appointment_date", ASCENDING),
+                ("_id", ASCENDING),
+            ]
+        },
+    ],
+    "appointment_slots": [
+        {
+            "keys": [("employee_id", ASCENDING), ("slot_start", ASCENDING)],
+            "unique": True,
+        },
+        {"keys": [("appointment_id", ASCENDING)]},
+        # Las reservas pasadas ya no protegen nada; MongoDB las borra solo
+        {"keys": [("slot_start", ASCENDING)], "expireAfterSeconds": 7 * 24 * 3600},
+    ],
+    "daily_appointment_stats": [
+        {
+            "keys": [
+                ("day", ASCENDING),
+                ("state", ASCENDING),
+                ("employee_id", ASCENDING),
+                ("service_id", ASCENDING),
+            ],
+            "unique": True,
+        },
+    ],
+}
+
+
+def index_models(collection: str, background: bool = False) -> list[IndexModel]:
+    models = []
+    for spec in INDEX_REGISTRY[collection]:
+        options = {key: value for key, value in spec.items() if key != "keys"}
+        if background:
+            options["background"] = True
+        models.append(IndexModel(spec["keys"], **options))
+    return models
+
+
+async def apply_indexes(
+    collections: list[str] | None = None,
+    background: bool = False,
+) -> None:
+    """Crea los índices registrados; los que ya existen no se modifican.
+
+    Cada índice se crea por separado, así uno que falla (por ejemplo un único
+    sobre datos duplicados) no impide crear los demás.
+    """
+    for collection in collections or INDEX_REGISTRY:
+        for model in index_models(collection, background):
+            name = model.document["name"]
+            try:
+                await db[collection].create_indexes([model])
+                logger.info("Índice %s.%s listo", collection, name)
+            except OperationFailure as exc:
+                logger.error(
+                    "No se pudo crear el índice %s.%s: %s", collection, name, exc
+                )
+
+
+async def index_report() -> dict[str, dict[str, list[str]]]:
+    """Compara el registro con la base de datos.
+
+    Por colección devuelve los índices registrados que faltan, los que existen
+    sin estar registrados y los que no han tenido accesos según $indexStats.
+    """
+    report = {}
+    for collection in INDEX_REGISTRY:
+        expected = {model.document["name"] for model in index_models(collection)}
+        existing = set(await db[collection].index_information())
+
+        cursor = await db[collection].aggregate([{"$indexStats": {}}])
+        unused = [
+            stats["name"]
+            async for stats in cursor
+            if stats["name"] != "_id_" and stats["accesses"]["ops"] == 0
+        ]
+
+        report[collection] = {
+            "missing": sorted(expected - existing),
+            "unregistered": sorted(existing - expected - {"_id_"}),
+            "unused": sorted(unused),
+        }
+    return report
+
+
+async def check_indexes() -> None:
+    await apply_indexes()
+    try:
+        report = await index_report()
+    except OperationFailure as exc:
+        logger.warning("No se pudo generar el reporte de índices: %s", exc)
+        return
+
+    for collection, drift in report.items():
+        if drift["missing"]:
+            logger.warning("Índices faltantes en %s: %s", collection, drift["missing"])
+        if drift["unregistered"]:
+            logger.warning(
+                "Índices no registrados en %s: %s", collection, drift["unregistered"]
+            )
+        if drift["unused"]:
+            logger.info("Índices sin uso en %s: %s", collection, drift["unused"])
+
+
+async def _run(args: argparse.Namespace) -> None:
+    if args.command == "apply":
+        await apply_indexes(args.collection or None, background=args.background)
+        return
+
+    for collection, drift in (await index_report()).items():
+        print(collection)
+        for kind, names in drift.items():
+            print(f"  {kind}: {', '.join(names) or '-'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Administra los índices de MongoDB.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    apply_parser = subparsers.add_parser("apply", help="Crea los índices registrados.")
+    apply_parser.add_argument(
+        "--collection",
+        action="append",
+        choices=sorted(INDEX_REGISTRY),
+        help="Limita la creación a una colección (se puede repetir).",
+    )
+    apply_parser.add_argument(
+        "--background",
+        action="store_true",
+        help=(
+            "Construye los índices en segundo plano. Solo tiene efecto antes de "
+            "MongoDB 4.2; desde esa versión se ignora y cada construcción bloquea "
+            "la colección solo al inicio y al final. En colecciones grandes usa "
+            "--collection para construir una colección a la vez."
+        ),
+    )
+    subparsers.add_parser("report", help="Muestra índices faltantes o sin uso.")
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
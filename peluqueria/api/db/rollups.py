@@ -0,0 +1,222 @@
+import argparse
+import asyncio
+import logging
+from datetime import date, datetime, timezone
+
+from pymongo import UpdateOne
+
+from peluqueria.api.db.db_connect import db
+from peluqueria.api.utils.date_utils import utc_to_co
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_COLLECTION = "daily_appointment_stats"
+
+
+def _day(appointment_date: datetime | str) -> str:
+    if isinstance(appointment_date, str):
+        appointment_date = datetime.fromisoformat(appointment_date)
+    if appointment_date.tzinfo is None:
+        appointment_date = appointment_date.replace(tzinfo=timezone.utc)
+    return utc_to_co(appointment_date).date().isoformat()
+
+
+def _rollup_updates(appointment: dict, sign: int) -> list[UpdateOne]:
+    # Cada cita suma en un documento con service_id = None (conteos por cita) y
+    # en uno por servicio, para no contar doble las citas con varios servicios.
+    key = {
+        "day": _day(appointment["appointment_date"]),
+        "state": appointment.get("state", ""),
+        "employee_id": appointment.get("employee_id", ""),
+    }
+    employee_name = appointment.get("employee_name", "")
+
+    updates = [
+        UpdateOne(
+            {**key, "service_id": None},
+            {
+                "$inc": {
+                    "appointments": sign,
+                    "revenue": sign * appointment.get("total_cost", 0),
+                },
+                "$set": {"employee_name": employee_name},
+            },
+            upsert=True,
+        )
+    ]
+
+    service_ids = appointment.get("service_ids", [])
+    service_names = appointment.get("service_names", [])
+    for index, service_id in enumerate(service_ids):
+        service_name = service_names[index] if index < len(service_names) else ""
+        updates.append(
+            UpdateOne(
+                {**key, "service_id": service_id},
+                {
+                    "$inc": {"appointments": sign},
+                    "$set": {
+                        "employee_name": employee_name,
+                        "service_name": service_name,
+                    },
+                },
+                upsert=True,
+            )
+        )
+
+    return updates
+
+
+async def apply_to_rollup(appointment: dict, sign: int = 1) -> None:
+    await db[ROLLUP_COLLECTION].bulk_write(_rollup_updates(appointment, sign))
+
+
+async def move_in_rollup(before: dict, after: dict) -> None:
+    tracked = (
+        "appointment_date",
+        "state",
+        "employee_id",
+        "service_ids",
+        "total_cost",
+    )
+    if all(before.get(field) == after.get(field) for field in tracked):
+        return
+
+    await db[ROLLUP_COLLECTION].bulk_write(
+        _rollup_updates(before, -1) + _rollup_updates(after, 1)
+    )
+
+
+def _sum_by(group_key: str | None, name_field: str | None = None) -> list[dict]:
+    group: dict = {"_id": group_key, "count": {"$sum": "$appointments"}}
+    name = "$_id"
+    if name_field:
+        group["name"] = {"$last": f"${name_field}"}
+        name = "$name"
+
+    return [
+        {"$group": group},
+        {"$match": {"count": {"$gt": 0}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$project": {"_id": 0, "name": {"$ifNull": [name, ""]}, "count": 1}},
+    ]
+
+
+async def rollup_stats(day: date) -> dict:
+    """Conteos del dashboard leídos desde el rollup diario."""
+    cursor = await db[ROLLUP_COLLECTION].aggregate(
+        [
+            {
+                "$facet": {
+                    "by_state": [
+                        {"$match": {"service_id": None}},
+                        *_sum_by("$state"),
+                    ],
+                    "by_service": [
+                        {"$match": {"service_id": {"$ne": None}}},
+                        *_sum_by("$service_id", "service_name"),
+                    ],
+                    "by_employee": [
+                        {"$match": {"service_id": None}},
+                        *_sum_by("$employee_id", "employee_name"),
+                    ],
+                    "day": [
+                        {"$match": {"service_id": None, "day": day.isoformat()}},
+                        *_sum_by(None),
+                    ],
+                }
+            }
+        ]
+    )
+    facets = (await cursor.to_list(length=1))[0]
+    by_state = {item["name"]: item["count"] for item in facets["by_state"]}
+
+    return {
+        "total": sum(by_state.values()),
+        "by_state": by_state,
+        "by_service": facets["by_service"],
+        "by_employee": facets["by_employee"],
+        "day": day,
+        "day_total": facets["day"][0]["count"] if facets["day"] else 0,
+    }
+
+
+def _rebuild_pipeline() -> list[dict]:
+    day = {
+        "$dateToString": {
+            "format": "%Y-%m-%d",
+            "date": {"$toDate": "$appointment_date"},
+            "timezone": "America/Bogota",
+        }
+    }
+    key = {"day": day, "state": "$state", "employee_id": "$employee_id"}
+
+    return [
+        {
+            "$group": {
+                "_id": {**key, "service_id": None},
+                "appointments": {"$sum": 1},
+                "revenue": {"$sum": "$total_cost"},
+                "employee_name": {"$last": "$employee_name"},
+            }
+        },
+        {
+            "$unionWith": {
+                "coll": "appointments",
+                "pipeline": [
+                    {
+                        "$unwind": {
+                            "path": "$service_ids",
+                            "includeArrayIndex": "service_index",
+                        }
+                    },
+                    {
+                        "$group": {
+                            "_id": {**key, "service_id": "$service_ids"},
+                            "appointments": {"$sum": 1},
+                            "employee_name": {"$last": "$employee_name"},
+                            "service_name": {
+                                "$last": {
+                                    "$arrayElemAt": [
+                                        "$service_names",
+                                        "$service_index",
+                                    ]
+                                }
+                            },
+                        }
+                    },
+                ],
+            }
+        },
+        {"$replaceWith": {"$mergeObjects": ["$$ROOT", "$_id"]}},
+        {"$unset": "_id"},
+        {"$out": ROLLUP_COLLECTION},
+    ]
+
+
+async def rebuild_rollup() -> None:
+    """Recalcula el rollup desde cero; $out reemplaza la colección al final."""
+    logger.info("Recalculando %s desde appointments", ROLLUP_COLLECTION)
+    cursor = await db.appointments.aggregate(_rebuild_pipeline())
+    await cursor.to_list(length=None)
+    total = await db[ROLLUP_COLLECTION].count_documents({})
+    logger.info("Rollup recalculado: %s documentos", total)
+
+
+async def ensure_rollup() -> None:
+    if await db[ROLLUP_COLLECTION].estimated_document_count():
+        return
+    if await db.appointments.estimated_document_count():
+        await rebuild_rollup()
+
+
+def main() -> None:
+    argparse.ArgumentParser(
+        description=f"Recalcula la colección {ROLLUP_COLLECTION} desde cero.",
+    ).parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(rebuild_rollup())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from peluqueria.api.db.db_connect import db
+from peluqueria.api.utils.availability import appointment_duration
+from peluqueria.api.utils.service_utils import service_catalog
+from peluqueria.api.utils.slot_bitmaps import SLOT_MINUTES
+
+logger = logging.getLogger(__name__)
+
+# Cada cita activa reserva un documento por slot de 5 minutos que ocupa. El
+# índice único (employee_id, slot_start) hace que de dos reservas concurrentes
+# sobre el mismo slot solo una pueda insertarse, sin bloquear otras reservas.
+SLOT_COLLECTION = "appointment_slots"
+
+DUPLICATE_KEY = 11000
+
+
+def _as_utc(value: datetime | str) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def slot_starts(start: datetime | str, duration_minutes: int) -> list[datetime]:
+    """Inicios de los slots que cubren [start, start + duration_minutes)."""
+    start = _as_utc(start)
+    end = start + timedelta(minutes=max(duration_minutes, 1))
+    slot = start.replace(
+        minute=start.minute - start.minute % SLOT_MINUTES, second=0, microsecond=0
+    )
+    starts = []
+    while slot < end:
+        starts.append(slot)
+        slot += timedelta(minutes=SLOT_MINUTES)
+    return starts
+
+
+def holds_slots(appointment: dict) -> bool:
+    return appointment.get("state") != "cancelled"
+
+
+async def appointment_slot_starts(appointment: dict) -> list[datetime]:
+    """Slots que debe tener reservados la cita; ninguno si está cancelada."""
+    if not holds_slots(appointment):
+        return []
+    services_by_id = (await service_catalog.snapshot()).by_id
+    duration = appointment_duration(appointment, services_by_id)
+    return slot_starts(appointment["appointment_date"], duration)
+
+
+async def reserve_slots(
+    appointment_id: ObjectId,
+    employee_id: str,
+    starts: list[datetime],
+) -> None:
+    """Reserva los slots de la cita o ninguno.
+
+    Si otro proceso ya tomó alguno, borra los que alcanzó a insertar y lanza
+    DuplicateKeyError.
+    """
+    if not starts:
+        return
+    try:
+        await db[SLOT_COLLECTION].insert_many(
+            [
+                {
+                    "employee_id": employee_id,
+                    "slot_start": start,
+                    "appointment_id": appointment_id,
+                }
+                for start in starts
+            ],
+        )
+    except BulkWriteError as exc:
+        await release_slots(appointment_id, employee_id, starts)
+        errors = exc.details.get("writeErrors", [])
+        if any(error.get("code") == DUPLICATE_KEY for error in errors):
+            raise DuplicateKeyError("Slot already reserved.") from exc
+        raise
+
+
+async def release_slots(
+    appointment_id: ObjectId,
+    employee_id: str | None = None,
+    starts: list[datetime] | None = None,
+) -> None:
+    """Libera los slots de la cita; sin ``employee_id`` ni ``starts`` libera todos."""
+    query: dict = {"appointment_id": appointment_id}
+    if employee_id is not None:
+        query["employee_id"] = employee_id
+    if starts is not None:
+        if not starts:
+            return
+        query["slot_start"] = {"$in": starts}
+    await db[SLOT_COLLECTION].delete_many(query)
+
+
+async def slot_changes(
+    previous: dict,
+    updated: dict,
+) -> tuple[list[datetime], list[datetime]]:
+    """Slots que la cita debe reservar y liberar al pasar de ``previous`` a ``updated``.
+
+    Los que se mantienen no se tocan, así mover una cita unos minutos no entra
+    en conflicto consigo misma. Los liberados son del empleado de ``previous``.
+    """
+    previous_starts = await appointment_slot_starts(previous)
+    updated_starts = await appointment_slot_starts(updated)
+    if previous["employee_id"] != updated["employee_id"]:
+        return updated_starts, previous_starts
+
+    return (
+        [start for start in updated_starts if start not in previous_starts],
+        [start for start in previous_starts if start not in updated_starts],
+    )
+
+
+async def rebuild_slots() -> None:
+    """Reserva los slots de las citas activas futuras que aún no los tengan."""
+    now = datetime.now(timezone.utc)
+    cursor = db.appointments.find(
+        {"state": {"$ne": "cancelled"}, "appointment_date": {"$gte": now}},
+        {
+            "employee_id": 1,
+            "appointment_date": 1,
+            "service_ids": 1,
+            "total_duration_minutes": 1,
+            "state": 1,
+        },
+    )
+
+    reserved = conflicts = 0
+    async for appointment in cursor:
+        if await db[SLOT_COLLECTION].find_one({"appointment_id": appointment["_id"]}):
+            continue
+        try:
+            await reserve_slots(
+                appointment["_id"],
+                appointment["employee_id"],
+                await appointment_slot_starts(appointment),
+            )
+            reserved += 1
+        except DuplicateKeyError:
+            conflicts += 1
+            logger.warning("La cita %s se cruza con otra cita", appointment["_id"])
+
+    logger.info("Slots reservados para %s citas, %s cruces", reserved, conflicts)
+
+
+async def ensure_slots() -> None:
+    if await db[SLOT_COLLECTION].estimated_document_count():
+        return
+    if await db.appointments.estimated_document_count():
+        await rebuild_slots()
+
+
+def main() -> None:
+    argparse.ArgumentParser(
+        description=f"Reserva en {SLOT_COLLECTION} los slots de las citas futuras.",
+    ).parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(rebuild_slots())
+
+
+if __name__ == "__main__":
+    main()
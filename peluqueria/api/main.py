@@ -2,21 +2,37 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from peluqueria.api.db.db_connect import create_indexes
+from peluqueria.api.db.backfill import ensure_backfill
+from peluqueria.api.db.identities import ensure_identities
+from peluqueria.api.db.indexes import check_indexes
+from peluqueria.api.db.rollups import ensure_rollup
+from peluqueria.api.db.slots import ensure_slots
 from peluqueria.api.routers import (
     appointments,
     auth,
+    availability,
+    calendar,
     employees,
+    metrics,
     reports,
     services,
     users,
 )
+from peluqueria.api.utils.report_utils import report_pool
+from peluqueria.api.utils.utils import password_pool
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await create_indexes()
+    await check_indexes()
+    # Antes del rollup y los slots, que leen los campos que completa
+    await ensure_backfill()
+    await ensure_rollup()
+    await ensure_identities()
+    await ensure_slots()
     yield
+    report_pool.shutdown()
+    password_pool.shutdown()
 
 
 fastapi_app: FastAPI = FastAPI()
@@ -26,4 +42,7 @@ fastapi_app.include_router(auth.router)
 fastapi_app.include_router(services.router)
 fastapi_app.include_router(employees.router)
 fastapi_app.include_router(appointments.router)
+fastapi_app.include_router(availability.router)
+fastapi_app.include_router(calendar.router)
 fastapi_app.include_router(reports.router)
+fastapi_app.include_router(metrics.router)
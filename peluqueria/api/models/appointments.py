@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 
 from pydantic import BaseModel
 
@@ -13,6 +13,8 @@ class Appointment(BaseModel):
 
 
 class AppointmentInDB(Appointment):
+    end_date: datetime
+    total_duration_minutes: int
     employee_name: str
     service_names: list[str]
     user_name: str
@@ -28,7 +30,45 @@ class AppointmentResponse(Appointment):
     user_name: str
     service_names: list[str]
     appointment_date: DateCo
+    end_date: DateCo | None = None
+    total_duration_minutes: int | None = None
     created_at: DateCo
     updated_at: DateCo
     state: str
     total_cost: float
+
+
+class StatCount(BaseModel):
+    name: str
+    count: int
+
+
+class AppointmentStats(BaseModel):
+    total: int
+    by_state: dict[str, int]
+    by_service: list[StatCount]
+    by_employee: list[StatCount]
+    day: date
+    day_total: int
+    total_users: int
+    active_users: int
+    total_employees: int
+
+
+class EmployeeAvailability(BaseModel):
+    employee_id: str
+    day: date
+    duration_minutes: int
+    slots: list[datetime]
+
+
+class SlotSuggestion(BaseModel):
+    employee_id: str
+    employee_name: str
+    start: datetime
+
+
+class AvailabilitySearch(BaseModel):
+    service_ids: list[str]
+    duration_minutes: int
+    items: list[SlotSuggestion]
@@ -4,3 +4,10 @@ from pydantic import BaseModel
 class Token(BaseModel):
     access_token: str
     token_type: str
+
+
+class TokenClaims(BaseModel):
+    sub: str
+    uid: str
+    role: str
+    ver: int = 0
@@ -0,0 +1,45 @@
+from datetime import date, time
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field, model_validator
+
+from peluqueria.api.models.types import DateCo
+
+# 0 = lunes ... 6 = domingo, como date.weekday()
+Weekday = Annotated[int, Field(ge=0, le=6)]
+
+
+class TimeInterval(BaseModel):
+    start: time
+    end: time
+
+    @model_validator(mode="after")
+    def check_order(self) -> "TimeInterval":
+        if self.end <= self.start:
+            raise ValueError("end must be after start")
+        return self
+
+
+class Holiday(BaseModel):
+    day: date
+    name: str
+    # Sin tramos el negocio cierra todo el día
+    hours: list[TimeInterval] = []
+
+
+class BusinessCalendar(BaseModel):
+    timezone: Literal["America/Bogota"] = "America/Bogota"
+    weekly_hours: dict[Weekday, list[TimeInterval]]
+    # Turnos por employee_id; un empleado sin turnos trabaja todo el horario
+    employee_shifts: dict[str, dict[Weekday, list[TimeInterval]]] = {}
+    holidays: list[Holiday] = []
+
+
+class BusinessCalendarResponse(BusinessCalendar):
+    updated_at: DateCo | None = None
+
+
+class DayHours(BaseModel):
+    day: date
+    holiday: str | None = None
+    intervals: list[TimeInterval]
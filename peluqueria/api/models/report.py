@@ -0,0 +1,14 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel
+
+ReportStatus = Literal["pending", "running", "done", "failed"]
+
+
+class ReportJob(BaseModel):
+    id: str
+    status: ReportStatus
+    content_hash: str
+    created_at: datetime
+    error: str | None = None
@@ -22,6 +22,8 @@ class UserInDB(User):
     created_at: datetime
     updated_at: datetime
     is_active: bool = True
+    # Se incrementa para revocar los tokens emitidos antes del cambio
+    token_version: int = 0
 
 
 class UserInDBResponse(UserInDB):
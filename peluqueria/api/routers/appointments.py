@@ -1,15 +1,45 @@
+import asyncio
 import logging
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from typing import Annotated
 
 from bson import ObjectId
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pymongo.errors import DuplicateKeyError
 
 from peluqueria.api.db.db_connect import db
+from peluqueria.api.db.rollups import apply_to_rollup, move_in_rollup, rollup_stats
+from peluqueria.api.db.slots import (
+    appointment_slot_starts,
+    holds_slots,
+    release_slots,
+    reserve_slots,
+    slot_changes,
+)
 from peluqueria.api.models.appointments import (
     Appointment,
     AppointmentInDB,
     AppointmentResponse,
+    AppointmentStats,
+)
+from peluqueria.api.models.pagination import Page
+from peluqueria.api.routers.auth import require_fresh_token, require_role
+from peluqueria.api.utils.appointment_utils import (
+    appointments_page,
+    build_appointments_query,
+    find_full_name,
+    find_services,
+    outside_business_hours,
+    schedule_fields,
+    services_fields,
+    slot_conflict,
+    unknown_services,
 )
+from peluqueria.api.utils.availability import invalidate_availability, is_bookable
+from peluqueria.api.utils.date_utils import today_co
+from peluqueria.api.utils.pagination import Limit
+from peluqueria.api.utils.user_utils import account_counts
+from peluqueria.constants import PAGE_SIZE
 
 logger = logging.getLogger(__name__)
 
@@ -22,105 +52,98 @@ router: APIRouter = APIRouter(prefix="/appointments", tags=["appointments"])
     status_code=status.HTTP_201_CREATED,
 )
 async def create_appointment(appointment: Appointment):
-    user_name = await db.users.find_one(
-        {"_id": ObjectId(appointment.user_id)},
-        {"first_name": 1, "last_name": 1, "_id": 0},
-    )
-    employee_name = await db.employees.find_one(
-        {"_id": ObjectId(appointment.employee_id)},
-        {"first_name": 1, "last_name": 1, "_id": 0},
+    (
+        user_full_name,
+        employee_full_name,
+        (services, unknown_service_ids),
+    ) = await asyncio.gather(
+        find_full_name(db.users, appointment.user_id),
+        find_full_name(db.employees, appointment.employee_id),
+        find_services(appointment.service_ids),
     )
 
-    service_names = []
-    total_cost = 0.0
+    if unknown_service_ids:
+        raise unknown_services(unknown_service_ids)
 
-    for service_id in appointment.service_ids:
-        service = await db.services.find_one(
-            {"_id": ObjectId(service_id)},
-            {"name": 1, "price": 1, "_id": 0},
-        )
-        if service:
-            service_names.append(service.get("name", ""))
-            total_cost += service.get("price", 0)
-
-    employee_full_name = ""
-    if employee_name:
-        first_name = employee_name.get("first_name", "")
-        last_name = employee_name.get("last_name", "")
-        employee_full_name = f"{first_name} {last_name}"
-
-    user_full_name = ""
-    if user_name:
-        first_name = user_name.get("first_name", "")
-        last_name = user_name.get("last_name", "")
-        user_full_name = f"{first_name} {last_name}"
+    schedule = await schedule_fields(
+        appointment.appointment_date, appointment.service_ids
+    )
+    if not await is_bookable({"employee_id": appointment.employee_id, **schedule}):
+        raise outside_business_hours()
 
     appointment_in_db = AppointmentInDB(
         user_id=appointment.user_id,
         employee_id=appointment.employee_id,
         service_ids=appointment.service_ids,
-        appointment_date=appointment.appointment_date,
+        **schedule,
         created_at=datetime.now(timezone.utc),
         updated_at=datetime.now(timezone.utc),
         employee_name=employee_full_name,
         user_name=user_full_name,
-        service_names=service_names,
+        **services_fields(services),
         state="pending",
-        total_cost=total_cost,
     )
 
     appointment_dict = appointment_in_db.model_dump()
-    appointment_id = (await db.appointments.insert_one(appointment_dict)).inserted_id
+    appointment_id = ObjectId()
+
+    # Los slots se reservan antes de insertar la cita: si otra reserva
+    # concurrente ganó alguno, esta falla sin haber escrito la cita
+    try:
+        await reserve_slots(
+            appointment_id,
+            appointment.employee_id,
+            await appointment_slot_starts(appointment_dict),
+        )
+    except DuplicateKeyError as exc:
+        raise slot_conflict() from exc
+
+    try:
+        await db.appointments.insert_one({"_id": appointment_id, **appointment_dict})
+    except Exception:
+        await release_slots(appointment_id)
+        raise
+    await apply_to_rollup(appointment_dict)
+    invalidate_availability(appointment_dict)
     appointment_dict["id"] = str(appointment_id)
 
     return AppointmentResponse.model_validate(appointment_dict)
 
 
-@router.get("", response_model=list[AppointmentResponse])
-async def get_appointments():
-    appointments = await db.appointments.find().to_list(length=None)
+@router.get(
+    "",
+    response_model=Page[AppointmentResponse],
+    dependencies=[Depends(require_role("employee"))],
+)
+async def get_appointments(
+    limit: Limit = PAGE_SIZE,
+    cursor: str | None = None,
+    state: str | None = None,
+    employee_id: str | None = None,
+    user_id: str | None = None,
+    date_from: Annotated[datetime | None, Query(alias="from")] = None,
+    date_to: Annotated[datetime | None, Query(alias="to")] = None,
+):
+    query = build_appointments_query(
+        state=state,
+        employee_id=employee_id,
+        user_id=user_id,
+        date_from=date_from,
+        date_to=date_to,
+    )
+    return await appointments_page(query, limit, cursor)
 
-    for appointment in appointments:
-        appointment["id"] = str(appointment.pop("_id"))
 
-        if not appointment.get("user_name") and appointment.get("user_id"):
-            user_name = await db.users.find_one(
-                {"_id": ObjectId(appointment["user_id"])},
-                {"first_name": 1, "last_name": 1, "_id": 0},
-            )
-            if user_name:
-                first_name = user_name.get("first_name", "")
-                last_name = user_name.get("last_name", "")
-                appointment["user_name"] = f"{first_name} {last_name}"
-            else:
-                appointment["user_name"] = "Usuario no encontrado"
-
-        if not appointment.get("employee_name") and appointment.get("employee_id"):
-            employee_name = await db.employees.find_one(
-                {"_id": ObjectId(appointment["employee_id"])},
-                {"first_name": 1, "last_name": 1, "_id": 0},
-            )
-            if employee_name:
-                first_name = employee_name.get("first_name", "")
-                last_name = employee_name.get("last_name", "")
-                appointment["employee_name"] = f"{first_name} {last_name}"
-            else:
-                appointment["employee_name"] = "Empleado no encontrado"
-
-        if not appointment.get("service_names") and appointment.get("service_ids"):
-            service_names = []
-            for service_id in appointment["service_ids"]:
-                service = await db.services.find_one(
-                    {"_id": ObjectId(service_id)},
-                    {"name": 1, "_id": 0},
-                )
-                if service:
-                    service_names.append(service.get("name", ""))
-            appointment["service_names"] = service_names
-
-    return [
-        AppointmentResponse.model_validate(appointment) for appointment in appointments
-    ]
+@router.get(
+    "/stats",
+    response_model=AppointmentStats,
+    dependencies=[Depends(require_role("employee"))],
+)
+async def get_appointment_stats(day: date | None = None):
+    stats, counts = await asyncio.gather(
+        rollup_stats(day or today_co()), account_counts()
+    )
+    return AppointmentStats.model_validate({**stats, **counts})
 
 
 @router.get("/{appointment_id}", response_model=AppointmentResponse)
@@ -135,39 +158,100 @@ async def get_appointment(appointment_id: str):
     return AppointmentResponse.model_validate(appointment)
 
 
-@router.delete("/{appointment_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/{appointment_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(require_fresh_token)],
+)
 async def delete_appointment(appointment_id: str):
-    result = await db.appointments.delete_one({"_id": ObjectId(appointment_id)})
-    if result.deleted_count == 0:
+    deleted_appointment = await db.appointments.find_one_and_delete(
+        {"_id": ObjectId(appointment_id)},
+    )
+    if not deleted_appointment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Appointment not found.",
         )
 
+    await release_slots(deleted_appointment["_id"])
+    await apply_to_rollup(deleted_appointment, -1)
+    invalidate_availability(deleted_appointment)
+
 
-@router.patch("/{appointment_id}", response_model=AppointmentResponse)
+@router.patch(
+    "/{appointment_id}",
+    response_model=AppointmentResponse,
+    dependencies=[Depends(require_fresh_token)],
+)
 async def update_appointment(appointment_id: str, update_data: dict):
     update_data["updated_at"] = datetime.now(timezone.utc)
 
-    result = await db.appointments.update_one(
-        {"_id": ObjectId(appointment_id)},
-        {"$set": update_data},
+    previous_appointment = await db.appointments.find_one(
+        {"_id": ObjectId(appointment_id)}
     )
-
-    if result.modified_count == 0:
+    if not previous_appointment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Appointment not found.",
         )
 
-    updated_appointment = await db.appointments.find_one(
-        {"_id": ObjectId(appointment_id)},
+    # Los nombres y el costo se recalculan junto con el horario, en el mismo $set
+    if "service_ids" in update_data:
+        services, unknown_service_ids = await find_services(update_data["service_ids"])
+        if unknown_service_ids:
+            raise unknown_services(unknown_service_ids)
+        update_data.update(services_fields(services))
+
+    if "appointment_date" in update_data or "service_ids" in update_data:
+        update_data.update(
+            await schedule_fields(
+                update_data.get(
+                    "appointment_date", previous_appointment["appointment_date"]
+                ),
+                update_data.get("service_ids", previous_appointment["service_ids"]),
+            )
+        )
+
+    updated_appointment = {**previous_appointment, **update_data}
+    reschedules = update_data.keys() & {
+        "appointment_date",
+        "service_ids",
+        "employee_id",
+    }
+    if (
+        reschedules
+        and holds_slots(updated_appointment)
+        and not await is_bookable(updated_appointment)
+    ):
+        raise outside_business_hours()
+    added_slots, released_slots = await slot_changes(
+        previous_appointment, updated_appointment
+    )
+    try:
+        await reserve_slots(
+            previous_appointment["_id"], updated_appointment["employee_id"], added_slots
+        )
+    except DuplicateKeyError as exc:
+        raise slot_conflict() from exc
+
+    result = await db.appointments.update_one(
+        {"_id": previous_appointment["_id"]}, {"$set": update_data}
     )
-    if not updated_appointment:
+    if not result.matched_count:
+        await release_slots(
+            previous_appointment["_id"], updated_appointment["employee_id"], added_slots
+        )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Appointment not found after update.",
+            detail="Appointment not found.",
         )
+    await release_slots(
+        previous_appointment["_id"], previous_appointment["employee_id"], released_slots
+    )
+
+    await move_in_rollup(previous_appointment, updated_appointment)
+    invalidate_availability(previous_appointment)
+    invalidate_availability(updated_appointment)
 
     updated_appointment["id"] = str(updated_appointment.pop("_id"))
     return AppointmentResponse.model_validate(updated_appointment)
@@ -5,11 +5,16 @@ import jwt
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jwt import InvalidTokenError
+from pydantic import ValidationError
 
-from peluqueria.api.models.auth import Token
+from peluqueria.api.models.auth import Token, TokenClaims
 from peluqueria.api.models.user import UserInDBResponse, UserResponse
-from peluqueria.api.utils.user_utils import search_user_db
-from peluqueria.api.utils.utils import verify_password
+from peluqueria.api.utils.user_utils import (
+    get_principal,
+    get_token_version,
+    search_user_db,
+)
+from peluqueria.api.utils.utils import verify_password_async
 from peluqueria.settings import Settings
 
 ALGORITHM = "HS256"
@@ -31,28 +36,55 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-) -> UserInDBResponse:
-    credentials_exception = HTTPException(
+def _credentials_exception(detail: str = "Could not validate credentials"):
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
+        detail=detail,
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+async def get_token_claims(
+    token: Annotated[str, Depends(oauth2_scheme)],
+) -> TokenClaims:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get("sub")
+        return TokenClaims.model_validate(payload)
+    except (InvalidTokenError, ValidationError) as exc:
+        raise _credentials_exception() from exc
 
-        if email is None:
-            raise credentials_exception
 
-        user = await search_user_db("email", email)
-    except InvalidTokenError as exc:
-        raise credentials_exception from exc
-    except HTTPException as exc:
-        raise credentials_exception from exc
+### Autorización solo con los claims del token, sin consultar la base de datos
+def require_role(*roles: str):
+    async def check_role(
+        claims: Annotated[TokenClaims, Depends(get_token_claims)],
+    ) -> TokenClaims:
+        if claims.role not in roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions.",
+            )
+        return claims
+
+    return check_role
 
-    return user
+
+### Para mutaciones sensibles: verifica que el token no haya sido revocado
+async def require_fresh_token(
+    claims: Annotated[TokenClaims, Depends(get_token_claims)],
+) -> TokenClaims:
+    if await get_token_version(claims.uid, claims.role) != claims.ver:
+        raise _credentials_exception("Token has been revoked.")
+    return claims
+
+
+async def get_current_user(
+    claims: Annotated[TokenClaims, Depends(get_token_claims)],
+) -> UserInDBResponse:
+    try:
+        return await get_principal(claims.sub)
+    except HTTPException as exc:
+        raise _credentials_exception() from exc
 
 
 async def get_current_active_user(
@@ -77,7 +109,7 @@ async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
             headers={"WWW-Authenticate": "Bearer"},
         ) from exc
 
-    if not verify_password(form_data.password, user.hashed_password):
+    if not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Contraseña incorrecta.",
@@ -85,7 +117,15 @@ async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
         )
 
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token({"sub": user.email}, access_token_expires)
+    access_token = create_access_token(
+        {
+            "sub": user.email,
+            "uid": user.id,
+            "role": user.role,
+            "ver": user.token_version,
+        },
+        access_token_expires,
+    )
 
     return Token(access_token=access_token, token_type="bearer")
 
@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from peluqueria.api.db.db_connect import db
+from peluqueria.api.models.appointments import AvailabilitySearch, SlotSuggestion
+from peluqueria.api.utils.appointment_utils import find_services
+from peluqueria.api.utils.availability import search_slots
+from peluqueria.api.utils.date_utils import today_co
+
+router: APIRouter = APIRouter(prefix="/availability", tags=["availability"])
+
+MAX_HORIZON_DAYS = 60
+MAX_SUGGESTIONS = 50
+
+
+### Primeros horarios libres entre todos los empleados
+
+
+@router.get("/search", response_model=AvailabilitySearch)
+async def search_availability(
+    service_ids: Annotated[list[str], Query(min_length=1)],
+    days: Annotated[int, Query(ge=1, le=MAX_HORIZON_DAYS)] = 14,
+    limit: Annotated[int, Query(ge=1, le=MAX_SUGGESTIONS)] = 10,
+    date_from: Annotated[date | None, Query(alias="from")] = None,
+):
+    services, unknown_service_ids = await find_services(service_ids)
+    if unknown_service_ids:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={
+                "message": "Unknown services.",
+                "unknown_service_ids": unknown_service_ids,
+            },
+        )
+
+    employees = await db.employees.find(
+        {"role": "employee", "is_active": True},
+        {"first_name": 1, "last_name": 1},
+    ).to_list(None)
+    names = {
+        str(employee["_id"]): f"{employee['first_name']} {employee['last_name']}"
+        for employee in employees
+    }
+
+    first_day = max(date_from or today_co(), today_co())
+    duration_minutes = sum(service.get("duration_minutes") or 0 for service in services)
+    found = await search_slots(
+        list(names),
+        [first_day + timedelta(days=offset) for offset in range(days)],
+        duration_minutes,
+        limit,
+    )
+
+    return AvailabilitySearch(
+        service_ids=service_ids,
+        duration_minutes=duration_minutes,
+        items=[
+            SlotSuggestion(
+                employee_id=employee_id,
+                employee_name=names[employee_id],
+                start=start,
+            )
+            for start, employee_id in found
+        ],
+    )
@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+
+from peluqueria.api.models.calendar import (
+    BusinessCalendar,
+    BusinessCalendarResponse,
+    DayHours,
+)
+from peluqueria.api.routers.auth import require_role
+from peluqueria.api.utils.business_calendar import (
+    CompiledCalendar,
+    business_calendar,
+    save_calendar,
+)
+from peluqueria.api.utils.date_utils import today_co
+
+router: APIRouter = APIRouter(prefix="/calendar", tags=["calendar"])
+
+MAX_HOURS_DAYS = 60
+
+
+def calendar_response(compiled: CompiledCalendar) -> BusinessCalendarResponse:
+    return BusinessCalendarResponse(
+        **compiled.calendar.model_dump(),
+        updated_at=compiled.updated_at,
+    )
+
+
+### Calendario del negocio
+
+
+@router.get("", response_model=BusinessCalendarResponse)
+async def get_calendar():
+    return calendar_response(await business_calendar.snapshot())
+
+
+@router.put(
+    "",
+    response_model=BusinessCalendarResponse,
+    dependencies=[Depends(require_role("employee"))],
+)
+async def update_calendar(calendar: BusinessCalendar):
+    return calendar_response(await save_calendar(calendar))
+
+
+### Horario de atención por día, con festivos y turnos aplicados
+
+
+@router.get("/hours", response_model=list[DayHours])
+async def get_hours(
+    date_from: Annotated[date | None, Query(alias="from")] = None,
+    days: Annotated[int, Query(ge=1, le=MAX_HOURS_DAYS)] = 7,
+    employee_id: str | None = None,
+):
+    compiled = await business_calendar.snapshot()
+    first_day = date_from or today_co()
+    return [
+        compiled.day_hours(first_day + timedelta(days=offset), employee_id)
+        for offset in range(days)
+    ]
@@ -1,26 +1,48 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from typing import Annotated
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pymongo.errors import DuplicateKeyError
 
 from peluqueria.api.db.db_connect import db
+from peluqueria.api.db.identities import release_identity
+from peluqueria.api.models.appointments import (
+    AppointmentResponse,
+    EmployeeAvailability,
+)
+from peluqueria.api.models.pagination import Page
 from peluqueria.api.models.user import (
     UserCreate,
     UserInDB,
     UserResponse,
     UserUpdateAdmin,
 )
+from peluqueria.api.routers.auth import require_role
+from peluqueria.api.utils.appointment_utils import (
+    appointments_page,
+    build_appointments_query,
+    find_services,
+    upcoming_from,
+)
+from peluqueria.api.utils.availability import available_slots
+from peluqueria.api.utils.pagination import Limit, paginate
 from peluqueria.api.utils.user_utils import (
-    check_if_user_exist,
+    email_changed,
+    email_conflict,
     get_employee_or_404,
+    insert_account,
+    invalidate_principal,
+    reserve_new_email,
+    revokes_tokens,
     search_user,
 )
 from peluqueria.api.utils.utils import (
-    hash_password,
+    hash_password_async,
     id_to_pydantic,
     id_to_pydantic_loop,
 )
+from peluqueria.constants import PAGE_SIZE
 
 router: APIRouter = APIRouter(prefix="/employees", tags=["employees"])
 
@@ -29,10 +51,6 @@ router: APIRouter = APIRouter(prefix="/employees", tags=["employees"])
 
 @router.post("", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(user: UserCreate):
-    if await check_if_user_exist(user.email):
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT, detail="User already exist."
-        )
     # Transformar la request al objeto UserInDB
     user_in_db = UserInDB(
         first_name=user.first_name,
@@ -40,26 +58,30 @@ async def create_user(user: UserCreate):
         email=user.email,
         phone=user.phone,
         role="employee",
-        hashed_password=hash_password(user.password),
+        hashed_password=await hash_password_async(user.password),
         created_at=datetime.now(timezone.utc),
         updated_at=datetime.now(timezone.utc),
         is_active=True,
     )
-    # Transformar UserInDB a dict para poder guardar en mongoDB
-    user_dict = user_in_db.model_dump()
-
-    user_id = (await db.employees.insert_one(user_dict)).inserted_id
-    user_dict["id"] = str(user_id)
+    # El email se reserva en identities antes de insertar, sin consultar si existe
+    user_dict = await insert_account("employees", user_in_db)
     return UserResponse.model_validate(user_dict)
 
 
 ### Buscar todos los usuarios
 
 
-@router.get("", response_model=list[UserResponse])
-async def get_users():
-    users = await db.employees.find({"role": "employee"}).to_list(length=None)
-    return [UserResponse.model_validate(id_to_pydantic_loop(user)) for user in users]
+@router.get("", response_model=Page[UserResponse])
+async def get_users(limit: Limit = PAGE_SIZE, cursor: str | None = None):
+    users, next_cursor = await paginate(
+        db.employees, {"role": "employee"}, limit, cursor
+    )
+    return Page(
+        items=[
+            UserResponse.model_validate(id_to_pydantic_loop(user)) for user in users
+        ],
+        next_cursor=next_cursor,
+    )
 
 
 ### Buscar usuarios por su ID endpoint
@@ -73,6 +95,61 @@ async def get_user(
     return user
 
 
+### Agenda de un empleado
+
+
+@router.get(
+    "/{user_id}/appointments",
+    response_model=Page[AppointmentResponse],
+    dependencies=[Depends(require_role("employee"))],
+)
+async def get_employee_appointments(
+    user_id: str,
+    limit: Limit = PAGE_SIZE,
+    cursor: str | None = None,
+    state: str | None = None,
+    upcoming: bool = True,
+    date_from: Annotated[datetime | None, Query(alias="from")] = None,
+    date_to: Annotated[datetime | None, Query(alias="to")] = None,
+):
+    query = build_appointments_query(
+        state=state,
+        employee_id=user_id,
+        date_from=upcoming_from(date_from, upcoming),
+        date_to=date_to,
+    )
+    return await appointments_page(query, limit, cursor)
+
+
+### Disponibilidad de un empleado
+
+
+@router.get("/{user_id}/availability", response_model=EmployeeAvailability)
+async def get_employee_availability(
+    user: Annotated[UserResponse, Depends(get_employee_or_404)],
+    user_id: str,
+    day: date,
+    service_ids: Annotated[list[str], Query(min_length=1)],
+):
+    services, unknown_service_ids = await find_services(service_ids)
+    if unknown_service_ids:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={
+                "message": "Unknown services.",
+                "unknown_service_ids": unknown_service_ids,
+            },
+        )
+
+    duration_minutes = sum(service.get("duration_minutes") or 0 for service in services)
+    return EmployeeAvailability(
+        employee_id=user_id,
+        day=day,
+        duration_minutes=duration_minutes,
+        slots=await available_slots(user_id, day, duration_minutes),
+    )
+
+
 ### Actualizar un usuario por su ID
 @router.patch("/{user_id}", response_model=UserResponse)
 async def update_user(
@@ -88,29 +165,36 @@ async def update_user(
             detail="No update data provided.",
         )
 
-    if (
-        "email" in update_data
-        and update_data["email"] != user.email
-        and await check_if_user_exist(update_data["email"])
-    ):
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Email already registered by another user.",
-        )
+    new_email = email_changed(update_data, user)
+    if new_email:
+        await reserve_new_email("employees", user, update_data["email"])
 
     update_data["updated_at"] = datetime.now(timezone.utc)
+    update: dict = {"$set": update_data}
+    if revokes_tokens(update_data, user):
+        update["$inc"] = {"token_version": 1}
 
-    updated_user_doc = await db.employees.find_one_and_update(
-        {"_id": ObjectId(user.id)},
-        {"$set": update_data},
-        return_document=True,
-    )
+    try:
+        updated_user_doc = await db.employees.find_one_and_update(
+            {"_id": ObjectId(user.id)},
+            update,
+            return_document=True,
+        )
+    except DuplicateKeyError as exc:
+        if new_email:
+            await release_identity(update_data["email"])
+        raise email_conflict() from exc
 
     if not updated_user_doc:
+        if new_email:
+            await release_identity(update_data["email"])
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found after update."
         )
 
+    if new_email:
+        await release_identity(user.email)
+    invalidate_principal(user.email)
     id_to_pydantic(updated_user_doc)
 
     return UserResponse.model_validate(updated_user_doc)
@@ -119,11 +203,13 @@ async def update_user(
 @router.delete("/{user_id}")
 async def delete_user(user_id: str):
     try:
-        await search_user("_id", ObjectId(user_id), "employee")
+        user = await search_user("_id", ObjectId(user_id), "employee")
     except HTTPException as exc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found."
         ) from exc
     await db.employees.delete_one({"_id": ObjectId(user_id)})
+    await release_identity(user.email)
+    invalidate_principal(user.email)
 
     return {"detail": "User deleted."}
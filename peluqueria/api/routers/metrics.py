@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+
+from peluqueria.api.utils.metrics import metrics_snapshot
+
+router: APIRouter = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("")
+async def get_metrics():
+    return metrics_snapshot()
@@ -2,32 +2,31 @@ from datetime import datetime, timezone
 from typing import Annotated
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from pymongo.errors import DuplicateKeyError
 
 from peluqueria.api.db.db_connect import db
+from peluqueria.api.models.pagination import Page
 from peluqueria.api.models.service import (
     Service,
     ServiceInDB,
     ServiceResponse,
     ServiceUpdateAdmin,
 )
+from peluqueria.api.utils.pagination import Limit, paginate_sorted
 from peluqueria.api.utils.service_utils import (
-    check_if_service_exist,
     get_service_or_404,
+    service_catalog,
+    service_name_conflict,
 )
-from peluqueria.api.utils.utils import id_to_pydantic, id_to_pydantic_loop
+from peluqueria.api.utils.utils import id_to_pydantic
+from peluqueria.constants import PAGE_SIZE
 
 router: APIRouter = APIRouter(prefix="/services", tags=["services"])
 
 
 @router.post("", response_model=ServiceResponse, status_code=status.HTTP_201_CREATED)
 async def create_service(service: Service):
-    if await check_if_service_exist(service.name):
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Service already registered by another service.",
-        )
-
     service_in_db = ServiceInDB(
         name=service.name,
         description=service.description or None,
@@ -40,18 +39,44 @@ async def create_service(service: Service):
 
     service_dict = service_in_db.model_dump()
 
-    service_id = (await db.services.insert_one(service_dict)).inserted_id
+    # El índice único de services.name rechaza los nombres repetidos
+    try:
+        service_id = (await db.services.insert_one(service_dict)).inserted_id
+    except DuplicateKeyError as exc:
+        raise service_name_conflict() from exc
+    service_catalog.invalidate()
     service_dict["id"] = str(service_id)
     return ServiceResponse.model_validate(service_dict)
 
 
-@router.get("", response_model=list[ServiceResponse])
-async def get_all_services():
-    services = await db.services.find().to_list(length=None)
-    return [
-        ServiceResponse.model_validate(id_to_pydantic_loop(service))
-        for service in services
-    ]
+@router.get(
+    "",
+    response_model=Page[ServiceResponse],
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Catalog not modified"}},
+)
+async def get_all_services(
+    response: Response,
+    limit: Limit = PAGE_SIZE,
+    cursor: str | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    # Se sirve desde la copia en memoria; el ETag cambia solo si cambia el catálogo
+    catalog = await service_catalog.snapshot()
+    if catalog.matches(if_none_match):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": catalog.etag},
+        )
+
+    services, next_cursor = paginate_sorted(catalog.services, limit, cursor)
+    response.headers["ETag"] = catalog.etag
+    return Page(
+        items=[
+            ServiceResponse.model_validate({**service, "id": str(service["_id"])})
+            for service in services
+        ],
+        next_cursor=next_cursor,
+    )
 
 
 @router.patch("/{service_id}", response_model=ServiceResponse)
@@ -68,23 +93,16 @@ async def update_service(
             detail="No update data provided.",
         )
 
-    if (
-        "name" in update_data
-        and update_data["name"] != service.name
-        and await check_if_service_exist(update_data["name"])
-    ):
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Service already registered by another service.",
-        )
-
     update_data["updated_at"] = datetime.now(timezone.utc)
 
-    updated_service_doc = await db.services.find_one_and_update(
-        {"_id": ObjectId(service.id)},
-        {"$set": update_data},
-        return_document=True,
-    )
+    try:
+        updated_service_doc = await db.services.find_one_and_update(
+            {"_id": ObjectId(service.id)},
+            {"$set": update_data},
+            return_document=True,
+        )
+    except DuplicateKeyError as exc:
+        raise service_name_conflict() from exc
 
     if not updated_service_doc:
         raise HTTPException(
@@ -92,6 +110,7 @@ async def update_service(
             detail="Service not found after update.",
         )
 
+    service_catalog.invalidate()
     id_to_pydantic(updated_service_doc)
 
     return ServiceResponse.model_validate(updated_service_doc)
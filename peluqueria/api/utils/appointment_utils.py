@@ -0,0 +1,395 @@
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+from pymongo.asynchronous.collection import AsyncCollection
+
+from peluqueria.api.db.db_connect import db
+from peluqueria.api.models.appointments import AppointmentResponse
+from peluqueria.api.models.pagination import Page
+from peluqueria.api.utils.pagination import paginate
+from peluqueria.api.utils.service_utils import service_catalog
+from peluqueria.settings import Settings
+
+
+async def find_full_name(collection: AsyncCollection, person_id: str) -> str:
+    if not ObjectId.is_valid(person_id):
+        return ""
+
+    person = await collection.find_one(
+        {"_id": ObjectId(person_id)},
+        {"first_name": 1, "last_name": 1, "_id": 0},
+    )
+    if not person:
+        return ""
+
+    first_name = person.get("first_name", "")
+    last_name = person.get("last_name", "")
+    return f"{first_name} {last_name}"
+
+
+async def find_services(service_ids: list[str]) -> tuple[list[dict], list[str]]:
+    """Busca los servicios en el catálogo en memoria y separa los ids desconocidos."""
+    services_by_id = (await service_catalog.snapshot()).by_id
+
+    services = []
+    unknown_ids = []
+    for service_id in service_ids:
+        service = services_by_id.get(service_id)
+        if service:
+            services.append(service)
+        else:
+            unknown_ids.append(service_id)
+
+    return services, unknown_ids
+
+
+def appointment_too_long() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail=(
+            "Appointment cannot last more than "
+            f"{Settings.MAX_APPOINTMENT_MINUTES} minutes."
+        ),
+    )
+
+
+async def schedule_fields(
+    appointment_date: datetime | str,
+    service_ids: list[str],
+) -> dict:
+    """Calcula appointment_date, end_date y total_duration_minutes de una cita.
+
+    La duración sale del catálogo en memoria y se guarda en la cita, así que
+    editar un servicio después no cambia el horario de las citas existentes.
+    """
+    if isinstance(appointment_date, str):
+        appointment_date = datetime.fromisoformat(appointment_date)
+
+    services_by_id = (await service_catalog.snapshot()).by_id
+    total_duration_minutes = sum(
+        services_by_id.get(service_id, {}).get("duration_minutes") or 0
+        for service_id in service_ids
+    )
+    if total_duration_minutes > Settings.MAX_APPOINTMENT_MINUTES:
+        raise appointment_too_long()
+
+    return {
+        "appointment_date": appointment_date,
+        "end_date": appointment_date + timedelta(minutes=total_duration_minutes),
+        "total_duration_minutes": total_duration_minutes,
+    }
+
+
+def overlapping_query(
+    employee_id: str | list[str],
+    start: datetime,
+    end: datetime,
+) -> dict:
+    """Citas del empleado (o empleados) que se cruzan con [start, end).
+
+    Como ninguna cita dura más de MAX_APPOINTMENT_MINUTES, el rango sobre
+    appointment_date queda acotado y el índice (employee_id, appointment_date,
+    end_date) resuelve la consulta recorriendo solo esa ventana.
+
+    Las citas creadas antes de guardar end_date también se devuelven dentro de
+    esa ventana; quien las use calcula su fin con ``appointment_duration``.
+    """
+    return {
+        "employee_id": (
+            {"$in": employee_id} if isinstance(employee_id, list) else employee_id
+        ),
+        "appointment_date": {
+            "$gte": start - timedelta(minutes=Settings.MAX_APPOINTMENT_MINUTES),
+            "$lt": end,
+        },
+        "$or": [{"end_date": {"$gt": start}}, {"end_date": None}],
+    }
+
+
+def unknown_services(unknown_service_ids: list[str]) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail={
+            "message": "Unknown services.",
+            "unknown_service_ids": unknown_service_ids,
+        },
+    )
+
+
+def services_fields(services: list[dict]) -> dict:
+    """service_names y total_cost de una cita con los servicios ya resueltos."""
+    return {
+        "service_names": [service.get("name", "") for service in services],
+        "total_cost": float(sum(service.get("price", 0) for service in services)),
+    }
+
+
+def outside_business_hours() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail="Appointment is outside the employee's working hours or in the past.",
+    )
+
+
+def slot_conflict() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="The employee already has an appointment at that time.",
+    )
+
+
+def build_appointments_query(
+    state: str | None = None,
+    employee_id: str | None = None,
+    user_id: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+) -> dict:
+    query: dict = {}
+    if state:
+        query["state"] = state
+    if employee_id:
+        query["employee_id"] = employee_id
+    if user_id:
+        query["user_id"] = user_id
+
+    date_range = {}
+    if date_from:
+        date_range["$gte"] = date_from
+    if date_to:
+        date_range["$lt"] = date_to
+    if date_range:
+        query["appointment_date"] = date_range
+
+    return query
+
+
+def upcoming_from(date_from: datetime | None, upcoming: bool) -> datetime | None:
+    """Límite inferior de fechas; con ``upcoming`` nunca es anterior a ahora."""
+    if date_from and date_from.tzinfo is None:
+        date_from = date_from.replace(tzinfo=timezone.utc)
+    if not upcoming:
+        return date_from
+
+    now = datetime.now(timezone.utc)
+    return max(date_from, now) if date_from else now
+
+
+async def appointments_page(
+    query: dict,
+    limit: int,
+    cursor: str | None = None,
+) -> Page[AppointmentResponse]:
+    appointments, next_cursor = await paginate(
+        db.appointments, query, limit, cursor, sort_field="appointment_date"
+    )
+
+    for appointment in appointments:
+        appointment["id"] = str(appointment.pop("_id"))
+
+    return Page(
+        items=[
+            AppointmentResponse.model_validate(appointment)
+            for appointment in appointments
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+def _to_object_id(expression: str | dict) -> dict:
+    return {
+        "$convert": {
+            "input": expression,
+            "to": "objectId",
+            "onError": None,
+            "onNull": None,
+        }
+    }
+
+
+def _is_missing(field: str) -> dict:
+    return {"$in": [{"$ifNull": [f"${field}", ""]}, ["", []]]}
+
+
+def _full_name_lookup(collection: str, id_field: str, name_field: str) -> dict:
+    # Solo se consulta la colección si el nombre desnormalizado no existe
+    return {
+        "$lookup": {
+            "from": collection,
+            "let": {
+                "ref_id": {
+                    "$cond": [
+                        _is_missing(name_field),
+                        _to_object_id(f"${id_field}"),
+                        None,
+                    ]
+                }
+            },
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$_id", "$$ref_id"]}}},
+                {
+                    "$project": {
+                        "_id": 0,
+                        "full_name": {"$concat": ["$first_name", " ", "$last_name"]},
+                    }
+                },
+            ],
+            "as": f"_{name_field}",
+        }
+    }
+
+
+def _services_lookup() -> dict:
+    return {
+        "$lookup": {
+            "from": "services",
+            "let": {
+                "ref_ids": {
+                    "$cond": [
+                        _is_missing("service_names"),
+                        {
+                            "$map": {
+                                "input": {"$ifNull": ["$service_ids", []]},
+                                "in": _to_object_id("$$this"),
+                            }
+                        },
+                        [],
+                    ]
+                }
+            },
+            "pipeline": [
+                {"$match": {"$expr": {"$in": ["$_id", "$$ref_ids"]}}},
+                {"$project": {"name": 1}},
+            ],
+            "as": "_service_names",
+        }
+    }
+
+
+def _per_service_id(lookup_field: str, value_field: str, fallback: object) -> dict:
+    """Un valor por cada elemento de service_ids, en su orden y con repetidos.
+
+    $lookup devuelve los servicios en el orden de la colección y sin repetir,
+    así que se busca cada id en el resultado en vez de usarlo directamente.
+    """
+    return {
+        "$map": {
+            "input": {"$ifNull": ["$service_ids", []]},
+            "as": "service_id",
+            "in": {
+                "$let": {
+                    "vars": {
+                        "service": {
+                            "$first": {
+                                "$filter": {
+                                    "input": f"${lookup_field}",
+                                    "cond": {
+                                        "$eq": [
+                                            "$$this._id",
+                                            _to_object_id("$$service_id"),
+                                        ]
+                                    },
+                                }
+                            }
+                        }
+                    },
+                    "in": {"$ifNull": [f"$$service.{value_field}", fallback]},
+                }
+            },
+        }
+    }
+
+
+def resolve_schedule_stages() -> list[dict]:
+    """Etapas que completan end_date y total_duration_minutes faltantes."""
+    return [
+        {
+            "$lookup": {
+                "from": "services",
+                "let": {
+                    "ref_ids": {
+                        "$map": {
+                            "input": {"$ifNull": ["$service_ids", []]},
+                            "in": _to_object_id("$$this"),
+                        }
+                    }
+                },
+                "pipeline": [
+                    {"$match": {"$expr": {"$in": ["$_id", "$$ref_ids"]}}},
+                    {"$project": {"duration_minutes": 1}},
+                ],
+                "as": "_services",
+            }
+        },
+        {
+            "$set": {
+                "appointment_date": {"$toDate": "$appointment_date"},
+                "total_duration_minutes": {
+                    "$ifNull": [
+                        "$total_duration_minutes",
+                        {"$sum": _per_service_id("_services", "duration_minutes", 0)},
+                    ]
+                },
+            }
+        },
+        {
+            "$set": {
+                "end_date": {
+                    "$ifNull": [
+                        "$end_date",
+                        {
+                            "$dateAdd": {
+                                "startDate": "$appointment_date",
+                                "unit": "minute",
+                                "amount": "$total_duration_minutes",
+                            }
+                        },
+                    ]
+                }
+            }
+        },
+        {"$unset": "_services"},
+    ]
+
+
+def _resolved_name(name_field: str, fallback: str) -> dict:
+    return {
+        "$cond": [
+            _is_missing(name_field),
+            {
+                "$ifNull": [
+                    {"$first": f"$_{name_field}.full_name"},
+                    fallback,
+                ]
+            },
+            f"${name_field}",
+        ]
+    }
+
+
+def resolve_names_stages() -> list[dict]:
+    """Etapas que completan user_name, employee_name y service_names faltantes."""
+    return [
+        _full_name_lookup("users", "user_id", "user_name"),
+        _full_name_lookup("employees", "employee_id", "employee_name"),
+        _services_lookup(),
+        {
+            "$set": {
+                "user_name": _resolved_name("user_name", "Usuario no encontrado"),
+                "employee_name": _resolved_name(
+                    "employee_name", "Empleado no encontrado"
+                ),
+                "service_names": {
+                    "$cond": [
+                        _is_missing("service_names"),
+                        _per_service_id(
+                            "_service_names", "name", "Servicio no encontrado"
+                        ),
+                        "$service_names",
+                    ]
+                },
+            }
+        },
+        {"$unset": ["_user_name", "_employee_name", "_service_names"]},
+    ]
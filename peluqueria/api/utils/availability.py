@@ -0,0 +1,245 @@
+import math
+from datetime import date, datetime, timedelta, timezone
+
+from peluqueria.api.db.db_connect import db
+from peluqueria.api.utils.appointment_utils import overlapping_query
+from peluqueria.api.utils.business_calendar import business_calendar
+from peluqueria.api.utils.cache import TTLCache
+from peluqueria.api.utils.date_utils import CO_TZ, co_day_bounds, utc_to_co
+from peluqueria.api.utils.service_utils import service_catalog
+from peluqueria.api.utils.slot_bitmaps import (
+    SLOT_MINUTES,
+    SLOTS_PER_DAY,
+    feasible_starts,
+    iter_slots,
+    slot_mask,
+    slots_for,
+)
+from peluqueria.settings import Settings
+
+occupancy_cache = TTLCache(
+    "availability_cache",
+    maxsize=Settings.AVAILABILITY_CACHE_SIZE,
+    ttl=Settings.AVAILABILITY_CACHE_TTL,
+)
+
+
+def _as_co(value: datetime | str) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return utc_to_co(value)
+
+
+def services_duration(service_ids: list[str], services_by_id: dict[str, dict]) -> int:
+    return sum(
+        services_by_id.get(service_id, {}).get("duration_minutes") or 0
+        for service_id in service_ids
+    )
+
+
+def appointment_duration(appointment: dict, services_by_id: dict[str, dict]) -> int:
+    """Duración guardada en la cita o, en citas antiguas, la de sus servicios."""
+    duration = appointment.get("total_duration_minutes")
+    if duration is not None:
+        return duration
+    return services_duration(appointment.get("service_ids") or [], services_by_id)
+
+
+def appointment_mask(
+    appointment: dict,
+    day_start: datetime,
+    services_by_id: dict[str, dict],
+) -> int:
+    offset = (_as_co(appointment["appointment_date"]) - day_start).total_seconds() / 60
+    end = offset + appointment_duration(appointment, services_by_id)
+    first = math.floor(offset / SLOT_MINUTES)
+    last = max(first + 1, math.ceil(end / SLOT_MINUTES))
+    return slot_mask(first, last - first)
+
+
+def _co_days(start: datetime, end: datetime) -> list[date]:
+    """Días de Colombia que toca el intervalo [start, end)."""
+    first = start.date()
+    last = (end - timedelta(microseconds=1)).date() if end > start else first
+    return [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+
+async def occupancy_map(
+    employee_ids: list[str],
+    days: list[date],
+) -> dict[tuple[str, str], int]:
+    """Bitmaps de ocupación por (employee_id, día ISO) de las citas no canceladas.
+
+    Los que no están en cache se cargan con una sola consulta para todos los
+    empleados y días, en vez de una por combinación.
+    """
+    catalog = await service_catalog.snapshot()
+    occupancy: dict[tuple[str, str], int] = {}
+    missing_employees: set[str] = set()
+    missing_days: set[date] = set()
+    for employee_id in employee_ids:
+        for day in days:
+            key = (employee_id, day.isoformat())
+            # Se guarda la versión del catálogo con el bitmap: si cambia la
+            # duración de un servicio, los calculados con la anterior no sirven
+            cached = occupancy_cache.get(key)
+            if cached is not None and cached[0] == catalog.version:
+                occupancy[key] = cached[1]
+            else:
+                missing_employees.add(employee_id)
+                missing_days.add(day)
+
+    if not missing_days:
+        return occupancy
+
+    loaded = {
+        (employee_id, day.isoformat()): 0
+        for employee_id in missing_employees
+        for day in missing_days
+    }
+    # Incluye las citas que empiezan el día anterior y terminan en el rango
+    appointments = await db.appointments.find(
+        {
+            **overlapping_query(
+                sorted(missing_employees),
+                co_day_bounds(min(missing_days))[0],
+                co_day_bounds(max(missing_days))[1],
+            ),
+            "state": {"$ne": "cancelled"},
+        },
+        {
+            "employee_id": 1,
+            "appointment_date": 1,
+            "service_ids": 1,
+            "total_duration_minutes": 1,
+        },
+    ).to_list(None)
+
+    for appointment in appointments:
+        start = _as_co(appointment["appointment_date"])
+        end = start + timedelta(
+            minutes=appointment_duration(appointment, catalog.by_id)
+        )
+        for day in _co_days(start, end):
+            key = (appointment["employee_id"], day.isoformat())
+            if key in loaded:
+                loaded[key] |= appointment_mask(
+                    appointment, co_day_bounds(day)[0], catalog.by_id
+                )
+
+    for key, occupied in loaded.items():
+        occupancy_cache.set(key, (catalog.version, occupied))
+    occupancy.update(loaded)
+    return occupancy
+
+
+async def day_occupancy(employee_id: str, day: date) -> int:
+    """Bitmap de slots ocupados por las citas no canceladas del empleado."""
+    occupancy = await occupancy_map([employee_id], [day])
+    return occupancy[(employee_id, day.isoformat())]
+
+
+def invalidate_availability(appointment: dict) -> None:
+    """Descarta los bitmaps de los días y el empleado de una cita creada, movida o borrada."""
+    if not appointment.get("employee_id") or not appointment.get("appointment_date"):
+        return
+    start = _as_co(appointment["appointment_date"])
+    end = start + timedelta(minutes=appointment.get("total_duration_minutes") or 0)
+    occupancy_cache.invalidate(
+        *[(appointment["employee_id"], day.isoformat()) for day in _co_days(start, end)]
+    )
+
+
+def elapsed_mask(day: date, now: datetime) -> int:
+    """Slots del día que ya empezaron a la hora ``now``."""
+    if day < now.date():
+        return slot_mask(0, SLOTS_PER_DAY)
+    if day > now.date():
+        return 0
+    return slot_mask(0, -(-(now.hour * 60 + now.minute) // SLOT_MINUTES))
+
+
+async def is_bookable(appointment: dict) -> bool:
+    """Si la cita cae dentro del horario y turno del empleado y aún no empezó."""
+    calendar = await business_calendar.snapshot()
+    services_by_id = (await service_catalog.snapshot()).by_id
+    now = datetime.now(CO_TZ)
+    start = _as_co(appointment["appointment_date"])
+    end = start + timedelta(minutes=appointment_duration(appointment, services_by_id))
+    for day in _co_days(start, end):
+        needed = appointment_mask(appointment, co_day_bounds(day)[0], services_by_id)
+        bookable = calendar.employee_mask(
+            appointment["employee_id"], day
+        ) & ~elapsed_mask(day, now)
+        if needed & ~bookable:
+            return False
+    return True
+
+
+def slot_time(day: date, slot: int) -> datetime:
+    return co_day_bounds(day)[0] + timedelta(minutes=slot * SLOT_MINUTES)
+
+
+async def available_slots(
+    employee_id: str,
+    day: date,
+    duration_minutes: int,
+) -> list[datetime]:
+    """Horas de inicio en las que el empleado puede atender ``duration_minutes``."""
+    calendar = await business_calendar.snapshot()
+    bookable = calendar.employee_mask(employee_id, day) & ~elapsed_mask(
+        day, datetime.now(CO_TZ)
+    )
+    if not bookable:
+        return []
+
+    occupied = await day_occupancy(employee_id, day)
+    starts = feasible_starts(bookable & ~occupied, slots_for(duration_minutes))
+    return [slot_time(day, slot) for slot in iter_slots(starts)]
+
+
+async def search_slots(
+    employee_ids: list[str],
+    days: list[date],
+    duration_minutes: int,
+    limit: int,
+) -> list[tuple[datetime, str]]:
+    """Primeros ``limit`` pares (inicio, employee_id) libres para ``duration_minutes``.
+
+    Los días se recorren en orden y cada uno se resuelve con operaciones de bits
+    sobre los bitmaps de todos los empleados, así que la búsqueda termina en el
+    primer día que completa el límite.
+    """
+    now = datetime.now(CO_TZ)
+    days = [day for day in sorted(days) if day >= now.date()]
+    length = slots_for(duration_minutes)
+    calendar = await business_calendar.snapshot()
+    occupancy = await occupancy_map(employee_ids, days)
+
+    found: list[tuple[datetime, str]] = []
+    for day in days:
+        elapsed = elapsed_mask(day, now)
+        remaining = limit - len(found)
+        candidates = sorted(
+            (slot, employee_id)
+            for employee_id in employee_ids
+            for slot in iter_slots(
+                feasible_starts(
+                    calendar.employee_mask(employee_id, day)
+                    & ~elapsed
+                    & ~occupancy[(employee_id, day.isoformat())],
+                    length,
+                ),
+                remaining,
+            )
+        )
+        found.extend(
+            (slot_time(day, slot), employee_id)
+            for slot, employee_id in candidates[:remaining]
+        )
+        if len(found) >= limit:
+            break
+
+    return found
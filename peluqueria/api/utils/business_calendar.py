@@ -0,0 +1,163 @@
+import asyncio
+from datetime import date, datetime, time, timezone
+from time import monotonic
+
+from peluqueria.api.db.db_connect import db
+from peluqueria.api.models.calendar import (
+    BusinessCalendar,
+    DayHours,
+    TimeInterval,
+)
+from peluqueria.api.utils.metrics import counter
+from peluqueria.api.utils.slot_bitmaps import mask_intervals, minutes_mask
+from peluqueria.settings import Settings
+
+CALENDAR_COLLECTION = "business_calendar"
+CALENDAR_ID = "default"
+
+# Horario que se usa mientras no se haya guardado un calendario
+DEFAULT_CALENDAR = BusinessCalendar(
+    weekly_hours={
+        **{
+            weekday: [TimeInterval(start=time(9), end=time(20))] for weekday in range(5)
+        },
+        5: [TimeInterval(start=time(9), end=time(18))],
+        6: [TimeInterval(start=time(10), end=time(17))],
+    }
+)
+
+# Días distintos cuyo bitmap se guarda en cada versión compilada
+DAY_TABLE_SIZE = 400
+
+
+def intervals_mask(intervals: list[TimeInterval]) -> int:
+    mask = 0
+    for interval in intervals:
+        mask |= minutes_mask(
+            interval.start.hour * 60 + interval.start.minute,
+            interval.end.hour * 60 + interval.end.minute,
+        )
+    return mask
+
+
+def _weekly_masks(hours: dict[int, list[TimeInterval]]) -> list[int]:
+    return [intervals_mask(hours.get(weekday, [])) for weekday in range(7)]
+
+
+class CompiledCalendar:
+    """Reglas del calendario convertidas una sola vez a bitmaps de slots.
+
+    Las consultas de un día solo combinan bitmaps ya calculados, y el
+    resultado de cada día queda guardado para las siguientes.
+    """
+
+    def __init__(self, calendar: BusinessCalendar, updated_at: datetime | None) -> None:
+        self.calendar = calendar
+        self.updated_at = updated_at
+        self.weekly = _weekly_masks(calendar.weekly_hours)
+        self.shifts = {
+            employee_id: _weekly_masks(shifts)
+            for employee_id, shifts in calendar.employee_shifts.items()
+        }
+        self.holidays = {
+            holiday.day: (holiday.name, intervals_mask(holiday.hours))
+            for holiday in calendar.holidays
+        }
+        self._days: dict[date, int] = {}
+
+    def open_mask(self, day: date) -> int:
+        """Slots en los que el negocio está abierto ese día."""
+        mask = self._days.get(day)
+        if mask is None:
+            holiday = self.holidays.get(day)
+            mask = holiday[1] if holiday else self.weekly[day.weekday()]
+            if len(self._days) >= DAY_TABLE_SIZE:
+                self._days.clear()
+            self._days[day] = mask
+        return mask
+
+    def employee_mask(self, employee_id: str, day: date) -> int:
+        """Slots abiertos ese día dentro del turno del empleado."""
+        mask = self.open_mask(day)
+        shifts = self.shifts.get(employee_id)
+        if shifts is not None:
+            mask &= shifts[day.weekday()]
+        return mask
+
+    def day_hours(self, day: date, employee_id: str | None = None) -> DayHours:
+        mask = (
+            self.employee_mask(employee_id, day) if employee_id else self.open_mask(day)
+        )
+        holiday = self.holidays.get(day)
+        return DayHours(
+            day=day,
+            holiday=holiday[0] if holiday else None,
+            intervals=[
+                TimeInterval(
+                    start=time(start // 60, start % 60),
+                    end=time(end // 60, end % 60) if end < 24 * 60 else time.max,
+                )
+                for start, end in mask_intervals(mask)
+            ],
+        )
+
+
+class BusinessCalendarStore:
+    """Calendario compilado en memoria, al estilo de ``ServiceCatalog``.
+
+    ``save_calendar`` llama a ``invalidate`` y el TTL limita cuánto tarda en
+    verse un cambio hecho desde otro proceso.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.version = 0
+        self.compiled = CompiledCalendar(DEFAULT_CALENDAR, None)
+        self._loaded_version = -1
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+        self.reloads = counter("business_calendar_reloads_total")
+
+    def invalidate(self) -> None:
+        self.version += 1
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_version == self.version and monotonic() < self._expires_at
+
+    async def _reload(self) -> None:
+        version = self.version
+        document = await db[CALENDAR_COLLECTION].find_one({"_id": CALENDAR_ID})
+
+        if document:
+            calendar = BusinessCalendar.model_validate(document)
+            self.compiled = CompiledCalendar(calendar, document.get("updated_at"))
+        else:
+            self.compiled = CompiledCalendar(DEFAULT_CALENDAR, None)
+        self._loaded_version = version
+        self._expires_at = monotonic() + self.ttl
+        self.reloads.inc()
+
+    async def snapshot(self) -> CompiledCalendar:
+        if not self._is_fresh():
+            async with self._lock:
+                if not self._is_fresh():
+                    await self._reload()
+        return self.compiled
+
+
+business_calendar = BusinessCalendarStore(ttl=Settings.BUSINESS_CALENDAR_TTL)
+
+
+async def save_calendar(calendar: BusinessCalendar) -> CompiledCalendar:
+    # Las horas se guardan como texto ("09:00:00"); BSON no tiene tipo time
+    await db[CALENDAR_COLLECTION].replace_one(
+        {"_id": CALENDAR_ID},
+        {
+            **calendar.model_dump(mode="json"),
+            "updated_at": datetime.now(timezone.utc),
+        },
+        upsert=True,
+    )
+    business_calendar.invalidate()
+    return await business_calendar.snapshot()
@@ -0,0 +1,51 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+from peluqueria.api.utils.metrics import counter, gauge
+
+
+class TTLCache:
+    """Cache LRU en memoria del proceso con expiración por entrada.
+
+    No es compartida entre procesos: cada worker mantiene la suya.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+        self.hits = counter(f"{name}_hits_total")
+        self.misses = counter(f"{name}_misses_total")
+        self.size = gauge(f"{name}_size")
+
+    def get(self, key: Any) -> Any | None:
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self.invalidate(key)
+            self.misses.inc()
+            return None
+
+        self._data.move_to_end(key)
+        self.hits.inc()
+        return entry[1]
+
+    def set(self, key: Any, value: Any) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        self.size.set(len(self._data))
+
+    def invalidate(self, *keys: Any) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+        self.size.set(len(self._data))
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.size.set(0)
@@ -1,6 +1,17 @@
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
 from zoneinfo import ZoneInfo
 
+CO_TZ = ZoneInfo("America/Bogota")
+
 
 def utc_to_co(dt_utc: datetime) -> datetime:
-    return dt_utc.astimezone(ZoneInfo("America/Bogota"))
+    return dt_utc.astimezone(CO_TZ)
+
+
+def today_co() -> date:
+    return datetime.now(CO_TZ).date()
+
+
+def co_day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min, tzinfo=CO_TZ)
+    return start, start + timedelta(days=1)
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+from peluqueria.api.utils.metrics import counter, gauge, histogram
+
+
+class PoolSaturatedError(Exception):
+    pass
+
+
+class BoundedExecutor:
+    """Ejecuta trabajo bloqueante fuera del event loop con un límite de cola.
+
+    Como máximo ``max_workers`` tareas corren a la vez y ``queue_limit`` esperan
+    turno; por encima de eso ``run`` lanza PoolSaturatedError de inmediato.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        queue_limit: int,
+        use_processes: bool = False,
+    ) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.capacity = max_workers + queue_limit
+        self._executor: Executor | None = None
+        self._use_processes = use_processes
+        self._pending = 0
+
+        self.in_flight = gauge(f"{name}_in_flight")
+        self.queue_depth = gauge(f"{name}_queue_depth")
+        self.rejected = counter(f"{name}_rejected_total")
+        self.latency = histogram(f"{name}_latency_seconds")
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            pool = ProcessPoolExecutor if self._use_processes else ThreadPoolExecutor
+            self._executor = pool(max_workers=self.max_workers)
+        return self._executor
+
+    @property
+    def is_saturated(self) -> bool:
+        return self._pending >= self.capacity
+
+    def _update_gauges(self) -> None:
+        self.in_flight.set(min(self._pending, self.max_workers))
+        self.queue_depth.set(max(self._pending - self.max_workers, 0))
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.is_saturated:
+            self.rejected.inc()
+            raise PoolSaturatedError(f"{self.name} pool is saturated")
+
+        self._pending += 1
+        self._update_gauges()
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            self._pending -= 1
+            self._update_gauges()
+            self.latency.observe(time.perf_counter() - started)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
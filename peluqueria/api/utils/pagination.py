@@ -0,0 +1,88 @@
+import base64
+from bisect import bisect_right
+from typing import Annotated
+
+from bson import json_util
+from fastapi import HTTPException, Query, status
+from pymongo.asynchronous.collection import AsyncCollection
+
+from peluqueria.constants import MAX_PAGE_SIZE
+
+Limit = Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)]
+
+
+def encode_cursor(doc: dict, sort_field: str = "_id") -> str:
+    key = {"id": doc["_id"]}
+    if sort_field != "_id":
+        key["key"] = doc.get(sort_field)
+    return base64.urlsafe_b64encode(json_util.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        key = json_util.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if "id" not in key:
+            raise ValueError
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor.",
+        ) from exc
+    return key
+
+
+def keyset_filter(cursor: str, sort_field: str = "_id") -> dict:
+    key = decode_cursor(cursor)
+    if sort_field == "_id":
+        return {"_id": {"$gt": key["id"]}}
+    return {
+        "$or": [
+            {sort_field: {"$gt": key.get("key")}},
+            {sort_field: key.get("key"), "_id": {"$gt": key["id"]}},
+        ]
+    }
+
+
+async def paginate(
+    collection: AsyncCollection,
+    query: dict,
+    limit: int,
+    cursor: str | None = None,
+    sort_field: str = "_id",
+) -> tuple[list[dict], str | None]:
+    """Pagina por keyset: cada página continúa después del último documento.
+
+    El orden es siempre ``(sort_field, _id)`` para que la consulta use el mismo
+    índice en la primera página y en la página N.
+    """
+    if cursor:
+        query = {"$and": [query, keyset_filter(cursor, sort_field)]}
+
+    sort = [("_id", 1)] if sort_field == "_id" else [(sort_field, 1), ("_id", 1)]
+    docs = await collection.find(query).sort(sort).limit(limit + 1).to_list(None)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1], sort_field)
+
+    return docs, next_cursor
+
+
+def paginate_sorted(
+    docs: list[dict],
+    limit: int,
+    cursor: str | None = None,
+) -> tuple[list[dict], str | None]:
+    """Igual que ``paginate`` pero sobre una lista en memoria ordenada por _id."""
+    start = 0
+    if cursor:
+        last_id = decode_cursor(cursor)["id"]
+        start = bisect_right(docs, last_id, key=lambda doc: doc["_id"])
+
+    page = docs[start : start + limit]
+    next_cursor = None
+    if start + limit < len(docs):
+        next_cursor = encode_cursor(page[-1])
+
+    return page, next_cursor
@@ -0,0 +1,245 @@
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from io import BytesIO
+from pathlib import Path
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from peluqueria.api.db.db_connect import db
+from peluqueria.api.db.rollups import rollup_stats
+from peluqueria.api.models.report import ReportJob
+from peluqueria.api.utils.date_utils import today_co
+from peluqueria.api.utils.executors import BoundedExecutor, PoolSaturatedError
+from peluqueria.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_JOBS = 100
+
+report_pool = BoundedExecutor(
+    "report_render",
+    max_workers=Settings.REPORT_WORKERS,
+    queue_limit=Settings.REPORT_QUEUE_LIMIT,
+    use_processes=Settings.REPORT_EXECUTOR == "process",
+)
+
+_jobs: dict[str, ReportJob] = {}
+_tasks: set[asyncio.Task] = set()
+
+
+async def collect_report_data() -> dict:
+    data = {"generated_at": datetime.now(tz=timezone.utc), "error": None}
+    try:
+        stats = await rollup_stats(today_co())
+        data.update(
+            total_appointments=stats["total"],
+            today_appointments=stats["day_total"],
+            total_users=await db.users.count_documents({}),
+            total_services=await db.services.count_documents({}),
+            top_services=[
+                (service["name"], service["count"])
+                for service in stats["by_service"][:5]
+            ],
+        )
+    except Exception as e:
+        data["error"] = str(e)
+    return data
+
+
+def render_dashboard_report(data: dict) -> bytes:
+    """Construye el PDF; es CPU intensivo, por eso corre en report_pool."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    styles = getSampleStyleSheet()
+    story = []
+
+    title_style = ParagraphStyle(
+        "CustomTitle",
+        parent=styles["Heading1"],
+        fontSize=24,
+        spaceAfter=30,
+        alignment=1,
+        textColor=colors.black,
+    )
+
+    subtitle_style = ParagraphStyle(
+        "CustomSubtitle",
+        parent=styles["Heading2"],
+        fontSize=16,
+        spaceAfter=20,
+        textColor=colors.darkblue,
+    )
+
+    normal_style = ParagraphStyle(
+        "CustomNormal",
+        parent=styles["Normal"],
+        fontSize=12,
+        spaceAfter=12,
+        textColor=colors.black,
+    )
+
+    title = Paragraph("Reporte del Dashboard - Peluquería Divine", title_style)
+    story.append(title)
+
+    date_info = Paragraph(
+        f"Fecha de generación: {data['generated_at'].strftime('%d/%m/%Y %H:%M')}",
+        normal_style,
+    )
+    story.append(date_info)
+    story.append(Spacer(1, 20))
+
+    if data["error"] is None:
+        metrics_title = Paragraph("Métricas Generales", subtitle_style)
+        story.append(metrics_title)
+
+        metrics_data = [
+            ["Métrica", "Valor"],
+            ["Total de Citas", str(data["total_appointments"])],
+            ["Citas de Hoy", str(data["today_appointments"])],
+            ["Total de Usuarios", str(data["total_users"])],
+            ["Total de Servicios", str(data["total_services"])],
+        ]
+
+        metrics_table = Table(metrics_data, colWidths=[2.5 * inch, 1.5 * inch])
+        metrics_table.setStyle(
+            TableStyle(
+                [
+                    ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                    ("FONTSIZE", (0, 0), (-1, 0), 14),
+                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+                    ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
+                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
+                ]
+            )
+        )
+
+        story.append(metrics_table)
+        story.append(Spacer(1, 30))
+
+        if data["top_services"]:
+            services_title = Paragraph("Servicios Más Solicitados", subtitle_style)
+            story.append(services_title)
+
+            services_data = [["Servicio", "Total de Citas"]]
+            for service_name, count in data["top_services"]:
+                services_data.append([service_name, str(count)])
+
+            services_table = Table(services_data, colWidths=[3 * inch, 1 * inch])
+            services_table.setStyle(
+                TableStyle(
+                    [
+                        ("BACKGROUND", (0, 0), (-1, 0), colors.darkblue),
+                        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                        ("FONTSIZE", (0, 0), (-1, 0), 12),
+                        ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+                        ("BACKGROUND", (0, 1), (-1, -1), colors.lightblue),
+                        ("GRID", (0, 0), (-1, -1), 1, colors.black),
+                    ]
+                )
+            )
+
+            story.append(services_table)
+            story.append(Spacer(1, 30))
+    else:
+        error_msg = Paragraph(
+            f"Error al generar el reporte: {data['error']}", normal_style
+        )
+        story.append(error_msg)
+
+    footer_text = Paragraph(
+        "Generado por Sistema de Gestión - Peluquería Divine", normal_style
+    )
+    story.append(Spacer(1, 50))
+    story.append(footer_text)
+
+    doc.build(story)
+
+    buffer.seek(0)
+    pdf_content = buffer.read()
+    buffer.close()
+
+    return pdf_content
+
+
+def report_hash(data: dict) -> str:
+    """Hash de los datos del reporte, sin la fecha de generación."""
+    content = {key: value for key, value in data.items() if key != "generated_at"}
+    encoded = json.dumps(content, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def report_path(content_hash: str) -> Path:
+    return Path(Settings.REPORTS_DIR) / f"{content_hash}.pdf"
+
+
+def get_report_job(job_id: str) -> ReportJob | None:
+    return _jobs.get(job_id)
+
+
+def _track(job: ReportJob) -> ReportJob:
+    _jobs[job.id] = job
+    while len(_jobs) > MAX_TRACKED_JOBS:
+        del _jobs[next(iter(_jobs))]
+    return job
+
+
+async def _render_job(job: ReportJob, data: dict) -> None:
+    job.status = "running"
+    try:
+        pdf_content = await report_pool.run(render_dashboard_report, data)
+        path = report_path(job.content_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(path.write_bytes, pdf_content)
+        job.status = "done"
+    except PoolSaturatedError:
+        job.status = "failed"
+        job.error = "Hay demasiados reportes en proceso, intenta de nuevo."
+    except Exception as e:
+        logger.exception("Error generando el reporte %s", job.id)
+        job.status = "failed"
+        job.error = str(e)
+
+
+async def create_report_job() -> ReportJob:
+    """Crea un trabajo de reporte o reutiliza el PDF ya generado con los mismos datos.
+
+    Lanza PoolSaturatedError si hay que renderizar y el pool está lleno.
+    """
+    data = await collect_report_data()
+    content_hash = report_hash(data)
+
+    for job in _jobs.values():
+        if job.content_hash == content_hash and job.status in ("pending", "running"):
+            return job
+
+    job = ReportJob(
+        id=uuid.uuid4().hex,
+        status="pending",
+        content_hash=content_hash,
+        created_at=datetime.now(tz=timezone.utc),
+    )
+
+    if data["error"] is None and report_path(content_hash).exists():
+        job.status = "done"
+        return _track(job)
+
+    if report_pool.is_saturated:
+        raise PoolSaturatedError(f"{report_pool.name} pool is saturated")
+
+    task = asyncio.create_task(_render_job(_track(job), data))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
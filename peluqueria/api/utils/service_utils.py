@@ -1,11 +1,73 @@
+import asyncio
+import hashlib
+import time
 from typing import Any
 
-from bson import ObjectId
+from bson import ObjectId, json_util
 from fastapi import HTTPException, status
 
 from peluqueria.api.db.db_connect import db
 from peluqueria.api.models.service import ServiceResponse
+from peluqueria.api.utils.metrics import counter
 from peluqueria.api.utils.utils import id_to_pydantic
+from peluqueria.settings import Settings
+
+
+class ServiceCatalog:
+    """Copia en memoria del catálogo de servicios, ordenada por _id.
+
+    create_service y update_service llaman a ``invalidate`` y la copia se
+    recarga en la siguiente lectura. El TTL limita cuánto puede quedar
+    desactualizada frente a cambios hechos por otro proceso.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.version = 0
+        self.services: list[dict] = []
+        self.by_id: dict[str, dict] = {}
+        self.etag = ""
+        self._loaded_version = -1
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+        self.reloads = counter("service_catalog_reloads_total")
+
+    def invalidate(self) -> None:
+        self.version += 1
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._loaded_version == self.version and time.monotonic() < self._expires_at
+        )
+
+    async def _reload(self) -> None:
+        version = self.version
+        services = await db.services.find().sort("_id", 1).to_list(None)
+
+        self.services = services
+        self.by_id = {str(service["_id"]): service for service in services}
+        digest = hashlib.sha1(json_util.dumps(services).encode()).hexdigest()
+        self.etag = f'"{digest}"'
+        self._loaded_version = version
+        self._expires_at = time.monotonic() + self.ttl
+        self.reloads.inc()
+
+    async def snapshot(self) -> "ServiceCatalog":
+        if not self._is_fresh():
+            async with self._lock:
+                if not self._is_fresh():
+                    await self._reload()
+        return self
+
+    def matches(self, if_none_match: str | None) -> bool:
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags
+
+
+service_catalog = ServiceCatalog(ttl=Settings.SERVICE_CATALOG_TTL)
 
 
 async def serach_service(field: str, key: Any) -> ServiceResponse:
@@ -26,6 +88,8 @@ async def get_service_or_404(service_id: str) -> ServiceResponse:
     return await serach_service("_id", ObjectId(service_id))
 
 
-async def check_if_service_exist(name: str) -> bool:
-    service = await db.services.find_one({"name": name})
-    return service is not None
+def service_name_conflict() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Service already registered by another service.",
+    )
@@ -0,0 +1,61 @@
+# Un día se representa como un entero de SLOTS_PER_DAY bits: el bit i
+# corresponde al slot [i*5, (i+1)*5) minutos desde medianoche en hora de
+# Colombia. Horarios, turnos y ocupación son bitmaps de este tipo y las
+# consultas de disponibilidad se resuelven con operaciones de bits sobre ellos.
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+
+def slot_mask(start: int, count: int) -> int:
+    """Bits encendidos para ``count`` slots desde ``start``, recortados al día."""
+    end = min(start + count, SLOTS_PER_DAY)
+    start = max(start, 0)
+    if end <= start:
+        return 0
+    return ((1 << (end - start)) - 1) << start
+
+
+def slots_for(minutes: int) -> int:
+    """Slots necesarios para ``minutes``; siempre al menos uno."""
+    return max(1, -(-minutes // SLOT_MINUTES))
+
+
+def minutes_mask(start_minute: int, end_minute: int) -> int:
+    """Slots completamente dentro de [start_minute, end_minute)."""
+    first = -(-start_minute // SLOT_MINUTES)
+    return slot_mask(first, end_minute // SLOT_MINUTES - first)
+
+
+def feasible_starts(free: int, length: int) -> int:
+    """Slots desde los que hay ``length`` slots libres consecutivos."""
+    # Tras cada paso el bit i indica que [i, i + covered) está libre; duplicar
+    # covered en cada paso deja el cálculo en O(log length) operaciones
+    starts = free
+    covered = 1
+    while covered < length:
+        step = min(covered, length - covered)
+        starts &= starts >> step
+        covered += step
+    return starts
+
+
+def iter_slots(mask: int, limit: int | None = None) -> list[int]:
+    """Índices de los bits encendidos, de menor a mayor."""
+    slots = []
+    while mask and (limit is None or len(slots) < limit):
+        lowest = mask & -mask
+        slots.append(lowest.bit_length() - 1)
+        mask ^= lowest
+    return slots
+
+
+def mask_intervals(mask: int) -> list[tuple[int, int]]:
+    """Tramos continuos del bitmap como (minuto inicial, minuto final)."""
+    intervals: list[tuple[int, int]] = []
+    for slot in iter_slots(mask):
+        start = slot * SLOT_MINUTES
+        if intervals and intervals[-1][1] == start:
+            intervals[-1] = (intervals[-1][0], start + SLOT_MINUTES)
+        else:
+            intervals.append((start, start + SLOT_MINUTES))
+    return intervals
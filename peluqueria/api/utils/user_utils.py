@@ -1,17 +1,74 @@
+import asyncio
 from typing import Any
 
 from bson import ObjectId
 from fastapi import HTTPException, status
+from pymongo.errors import DuplicateKeyError
 
 from peluqueria.api.db.db_connect import db
-from peluqueria.api.models.user import UserInDBResponse, UserResponse
+from peluqueria.api.db.identities import (
+    find_account_by_email,
+    release_identity,
+    reserve_identity,
+)
+from peluqueria.api.models.user import UserInDB, UserInDBResponse, UserResponse
+from peluqueria.api.utils.cache import TTLCache
 from peluqueria.api.utils.utils import id_to_pydantic
-
-
-async def check_if_user_exist(email: str) -> bool:
-    data_user = await db.users.find_one({"email": email})
-    data_employee = await db.employees.find_one({"email": email})
-    return data_user is not None or data_employee is not None
+from peluqueria.settings import Settings
+
+# Usuarios autenticados por email (el sub del token)
+principal_cache = TTLCache(
+    "principal_cache",
+    maxsize=Settings.PRINCIPAL_CACHE_SIZE,
+    ttl=Settings.PRINCIPAL_CACHE_TTL,
+)
+
+
+async def insert_account(collection: str, user_in_db: UserInDB) -> dict:
+    """Reserva el email en identities y luego inserta la cuenta.
+
+    La reserva es la que garantiza que el email sea único entre users y
+    employees, sin consultar antes si existe.
+    """
+    user_dict = user_in_db.model_dump()
+    user_dict["_id"] = ObjectId()
+
+    conflict = HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="User already exist.",
+    )
+    try:
+        await reserve_identity(user_in_db.email, collection, user_dict["_id"])
+    except DuplicateKeyError as exc:
+        raise conflict from exc
+
+    # El índice único de email en la colección es la segunda barrera, por si
+    # identities no está sincronizada
+    try:
+        await db[collection].insert_one(user_dict)
+    except DuplicateKeyError as exc:
+        await release_identity(user_in_db.email)
+        raise conflict from exc
+    except Exception:
+        await release_identity(user_in_db.email)
+        raise
+
+    id_to_pydantic(user_dict)
+    return user_dict
+
+
+def email_conflict() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Email already registered by another user.",
+    )
+
+
+async def reserve_new_email(collection: str, user: UserResponse, email: str) -> None:
+    try:
+        await reserve_identity(email, collection, ObjectId(user.id))
+    except DuplicateKeyError as exc:
+        raise email_conflict() from exc
 
 
 async def search_user(field: str, key: Any, user_type: str) -> UserResponse:
@@ -32,10 +89,12 @@ async def search_user(field: str, key: Any, user_type: str) -> UserResponse:
 
 
 async def search_user_db(field: str, key: Any) -> UserInDBResponse:
-    data = await db.users.find_one({field: key})
-
-    if not data:
-        data = await db.employees.find_one({field: key})
+    if field == "email":
+        data = await find_account_by_email(key)
+    else:
+        data = await db.users.find_one({field: key})
+        if not data:
+            data = await db.employees.find_one({field: key})
 
     if not data:
         raise HTTPException(
@@ -48,6 +107,55 @@ async def search_user_db(field: str, key: Any) -> UserInDBResponse:
     return UserInDBResponse.model_validate(data)
 
 
+async def get_principal(email: str) -> UserInDBResponse:
+    user = principal_cache.get(email)
+    if user is None:
+        user = await search_user_db("email", email)
+        principal_cache.set(email, user)
+    return user
+
+
+async def get_token_version(user_id: str, role: str) -> int | None:
+    """Versión de token vigente, o None si el usuario no existe o está inactivo."""
+    if not ObjectId.is_valid(user_id):
+        return None
+
+    collection = db.employees if role == "employee" else db.users
+    data = await collection.find_one(
+        {"_id": ObjectId(user_id)},
+        {"token_version": 1, "is_active": 1},
+    )
+    if not data or not data.get("is_active", True):
+        return None
+    return data.get("token_version", 0)
+
+
+async def account_counts() -> dict[str, int]:
+    """Clientes, clientes activos y empleados, contados con los índices por rol."""
+    users, active_users, employees = await asyncio.gather(
+        db.users.count_documents({"role": "customer"}),
+        db.users.count_documents({"role": "customer", "is_active": True}),
+        db.employees.count_documents({"role": "employee"}),
+    )
+    return {
+        "total_users": users,
+        "active_users": active_users,
+        "total_employees": employees,
+    }
+
+
+def email_changed(update_data: dict, user: UserResponse) -> bool:
+    return "email" in update_data and update_data["email"] != user.email
+
+
+def revokes_tokens(update_data: dict, user: UserResponse) -> bool:
+    return email_changed(update_data, user) or update_data.get("is_active") is False
+
+
+def invalidate_principal(*emails: str) -> None:
+    principal_cache.invalidate(*emails)
+
+
 ### Dependencia para buscar usuarios
 async def get_user_or_404(user_id: str, user_type: str) -> UserResponse | HTTPException:
     return await search_user("_id", ObjectId(user_id), user_type)
@@ -1,4 +1,15 @@
 import bcrypt
+from fastapi import HTTPException, status
+
+from peluqueria.api.utils.executors import BoundedExecutor, PoolSaturatedError
+from peluqueria.settings import Settings
+
+password_pool = BoundedExecutor(
+    "password_hashing",
+    max_workers=Settings.PASSWORD_WORKERS,
+    queue_limit=Settings.PASSWORD_QUEUE_LIMIT,
+    use_processes=Settings.PASSWORD_EXECUTOR == "process",
+)
 
 
 def hash_password(password: str) -> str:
@@ -12,6 +23,26 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     )
 
 
+async def _run_password_task(fn, *args):
+    try:
+        return await password_pool.run(fn, *args)
+    except PoolSaturatedError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, try again later.",
+            headers={"Retry-After": "1"},
+        ) from exc
+
+
+### Versiones async: bcrypt corre en password_pool y no bloquea el event loop
+async def hash_password_async(password: str) -> str:
+    return await _run_password_task(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_task(verify_password, plain_password, hashed_password)
+
+
 def id_to_pydantic(doc: dict) -> None:
     doc["id"] = str(doc["_id"])
     del doc["_id"]
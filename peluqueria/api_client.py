@@ -0,0 +1,142 @@
+import asyncio
+import random
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+import httpx
+
+from peluqueria.api.main import fastapi_app
+from peluqueria.api.utils.metrics import counter, gauge, histogram
+from peluqueria.settings import Settings
+
+# Prefijo de ruta -> timeout en segundos; gana el prefijo más largo que coincida
+ROUTE_TIMEOUTS: dict[str, float] = {
+    "/auth": 15.0,  # bcrypt corre en un pool que puede tener cola
+    "/reports": 30.0,
+    "/appointments/stats": 5.0,
+}
+
+IDEMPOTENT_METHODS = {"GET", "HEAD"}
+RETRY_STATUSES = {502, 503, 504}
+RETRY_BACKOFF = 0.1
+
+_requests = counter("api_client_requests_total")
+_retries = counter("api_client_retries_total")
+_errors = counter("api_client_errors_total")
+_in_flight = gauge("api_client_in_flight")
+_connections = gauge("api_client_connections")
+_idle_connections = gauge("api_client_idle_connections")
+_latency = histogram("api_client_latency_seconds")
+
+
+def route_timeout(path: str) -> float:
+    matches = [prefix for prefix in ROUTE_TIMEOUTS if path.startswith(prefix)]
+    if not matches:
+        return Settings.API_TIMEOUT
+    return ROUTE_TIMEOUTS[max(matches, key=len)]
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """Reintenta los GET fallidos con backoff exponencial y jitter, y mide cada envío."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, retries: int) -> None:
+        self.transport = transport
+        self.retries = retries
+
+    def _update_pool_gauges(self) -> None:
+        pool = getattr(self.transport, "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return
+        _connections.set(len(connections))
+        _idle_connections.set(sum(1 for conn in connections if conn.is_idle()))
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        _requests.inc()
+        _in_flight.inc()
+        started = time.perf_counter()
+        try:
+            return await self.transport.handle_async_request(request)
+        except httpx.TransportError:
+            _errors.inc()
+            raise
+        finally:
+            _in_flight.dec()
+            _latency.observe(time.perf_counter() - started)
+            self._update_pool_gauges()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        retries = self.retries if request.method in IDEMPOTENT_METHODS else 0
+        attempt = 0
+        while True:
+            try:
+                response = await self._send(request)
+            except httpx.TransportError:
+                if attempt >= retries:
+                    raise
+            else:
+                if attempt >= retries or response.status_code not in RETRY_STATUSES:
+                    return response
+                await response.aclose()
+
+            attempt += 1
+            _retries.inc()
+            await asyncio.sleep(random.uniform(0, RETRY_BACKOFF * 2**attempt))
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class ApiClient(httpx.AsyncClient):
+    def build_request(self, method: str, url: Any, **kwargs: Any) -> httpx.Request:
+        # Sin timeout explícito se usa el de la ruta
+        if kwargs.get("timeout", httpx.USE_CLIENT_DEFAULT) is httpx.USE_CLIENT_DEFAULT:
+            kwargs["timeout"] = route_timeout(httpx.URL(str(url)).path)
+        return super().build_request(method, url, **kwargs)
+
+
+_client: ApiClient | None = None
+
+
+def _build_client() -> ApiClient:
+    if Settings.API_TRANSPORT == "http":
+        # API desplegada aparte: conexiones keep-alive reutilizadas entre eventos
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=Settings.API_MAX_CONNECTIONS,
+                max_keepalive_connections=Settings.API_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=Settings.API_KEEPALIVE_EXPIRY,
+            ),
+        )
+    else:
+        # La API vive en el mismo proceso que Reflex (api_transformer), así que
+        # las peticiones se entregan directo a la app ASGI sin pasar por la red
+        transport = httpx.ASGITransport(app=fastapi_app)
+
+    return ApiClient(
+        transport=RetryTransport(transport, retries=Settings.API_GET_RETRIES),
+        base_url=Settings.API_BACKEND_URL,
+    )
+
+
+def api_client() -> ApiClient:
+    """Cliente compartido para llamar a la API desde los estados de Reflex."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+@asynccontextmanager
+async def api_client_lifespan() -> AsyncIterator[None]:
+    """Abre el cliente al iniciar la app y cierra sus conexiones al apagarla."""
+    api_client()
+    yield
+    if _client is not None:
+        await _client.aclose()
+
+
+def auth_headers(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
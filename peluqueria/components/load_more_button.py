@@ -0,0 +1,20 @@
+import reflex as rx
+
+
+def load_more_button(has_more: rx.Var, on_click: rx.EventHandler) -> rx.Component:
+    return rx.cond(
+        has_more,
+        rx.flex(
+            rx.button(
+                rx.icon("chevrons-down", size=16),
+                "Cargar más",
+                variant="soft",
+                color_scheme="gray",
+                cursor="pointer",
+                on_click=on_click,
+            ),
+            justify="center",
+            width="100%",
+            padding_y="1rem",
+        ),
+    )
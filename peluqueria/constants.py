@@ -6,3 +6,6 @@ PHONE_REGEX = re.compile(r"^3\d{9}$")
 HTTP_200_OK = 200
 HTTP_201_CREATED = 201
 HTTP_204_NO_CONTENT = 204
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
@@ -1,6 +1,7 @@
 import reflex as rx
 
 from peluqueria.api.main import fastapi_app, lifespan
+from peluqueria.api_client import api_client_lifespan
 from peluqueria.pages.appointments import appointments
 from peluqueria.pages.appointments_dashboard import appointments_dashboard
 from peluqueria.pages.dashboard import main_dashboard
@@ -24,3 +25,4 @@ app: rx.App = rx.App(
 )
 
 app.register_lifespan_task(lifespan)
+app.register_lifespan_task(api_client_lifespan)
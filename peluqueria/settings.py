@@ -9,5 +9,35 @@ class Settings:
     MONGO_DB_URI: str = os.getenv("MONGO_DB_URI") or "mongodb://localhost:27017/"
     MONGO_DB_NAME: str = os.getenv("MONGO_DB_NAME") or "local"
     API_BACKEND_URL: str = os.getenv("API_BACKEND_URL") or "http://localhost:8000"
+    # "asgi": los estados llaman a la API en el mismo proceso; "http": por red
+    API_TRANSPORT: str = os.getenv("API_TRANSPORT") or "asgi"
+    API_TIMEOUT: float = float(os.getenv("API_TIMEOUT") or 10)
+    API_GET_RETRIES: int = int(os.getenv("API_GET_RETRIES") or 2)
+    API_MAX_CONNECTIONS: int = int(os.getenv("API_MAX_CONNECTIONS") or 20)
+    API_MAX_KEEPALIVE_CONNECTIONS: int = int(
+        os.getenv("API_MAX_KEEPALIVE_CONNECTIONS") or 10
+    )
+    API_KEEPALIVE_EXPIRY: float = float(os.getenv("API_KEEPALIVE_EXPIRY") or 30)
     HASH_PASSWORD_SECRET_KEY: str = os.getenv("HASH_PASSWORD_SECRET_KEY=") or "default"
     ACCESS_TOKEN_EXPIRE_DAYS: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_DAYS") or 3)
+    REPORT_WORKERS: int = int(os.getenv("REPORT_WORKERS") or 2)
+    REPORT_QUEUE_LIMIT: int = int(os.getenv("REPORT_QUEUE_LIMIT") or 4)
+    # "thread" o "process"; con "process" ReportLab no compite por el GIL
+    REPORT_EXECUTOR: str = os.getenv("REPORT_EXECUTOR") or "thread"
+    REPORTS_DIR: str = os.getenv("REPORTS_DIR") or "generated_reports"
+    # Cache de usuarios autenticados; PRINCIPAL_CACHE_TTL=0 la desactiva
+    PRINCIPAL_CACHE_TTL: int = int(os.getenv("PRINCIPAL_CACHE_TTL") or 60)
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE") or 1024)
+    # Segundos que la copia en memoria del catálogo de servicios se considera válida
+    SERVICE_CATALOG_TTL: int = int(os.getenv("SERVICE_CATALOG_TTL") or 300)
+    # Segundos que el calendario compilado se considera válido sin recargarlo
+    BUSINESS_CALENDAR_TTL: int = int(os.getenv("BUSINESS_CALENDAR_TTL") or 300)
+    # Duración máxima de una cita; acota las consultas de citas que se cruzan
+    MAX_APPOINTMENT_MINUTES: int = int(os.getenv("MAX_APPOINTMENT_MINUTES") or 480)
+    # Bitmaps de ocupación por empleado y día; AVAILABILITY_CACHE_TTL=0 la desactiva
+    AVAILABILITY_CACHE_TTL: int = int(os.getenv("AVAILABILITY_CACHE_TTL") or 300)
+    AVAILABILITY_CACHE_SIZE: int = int(os.getenv("AVAILABILITY_CACHE_SIZE") or 2048)
+    PASSWORD_WORKERS: int = int(os.getenv("PASSWORD_WORKERS") or 4)
+    PASSWORD_QUEUE_LIMIT: int = int(os.getenv("PASSWORD_QUEUE_LIMIT") or 32)
+    # bcrypt libera el GIL, así que "thread" suele bastar
+    PASSWORD_EXECUTOR: str = os.getenv("PASSWORD_EXECUTOR") or "thread"
@@ -1,7 +1,8 @@
 import httpx
 import reflex as rx
 
-from peluqueria.settings import Settings
+from peluqueria.api_client import api_client, auth_headers
+from peluqueria.views.home.contact.contact import ContactState
 from peluqueria.views.home.services.services import ServicesState
 
 
@@ -41,20 +42,19 @@ class AuthState(rx.State):
         self.loading = True
 
         try:
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.get(
-                    "/auth/me",
-                    headers={"Authorization": f"Bearer {self.access_token}"},
-                    timeout=10.0,
-                )
-
-                if response.status_code == 200:
-                    self.user_data = response.json()
-                    self.is_authenticated = True
-                else:
-                    self.user_data = {}
-                    self.is_authenticated = False
-                    self.access_token = ""
+            client = api_client()
+            response = await client.get(
+                "/auth/me",
+                headers=auth_headers(self.access_token),
+            )
+
+            if response.status_code == 200:
+                self.user_data = response.json()
+                self.is_authenticated = True
+            else:
+                self.user_data = {}
+                self.is_authenticated = False
+                self.access_token = ""
         except Exception as e:
             print(f"Error obteniendo datos del usuario: {e}")
             self.user_data = {}
@@ -68,32 +68,31 @@ class AuthState(rx.State):
         self.loading = True
 
         try:
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                form_data = {"username": email, "password": password}
-
-                response = await client.post(
-                    "/auth/login",
-                    data=form_data,
-                    headers={"Content-Type": "application/x-www-form-urlencoded"},
-                    timeout=10.0,
-                )
-
-                if response.status_code == 200:
-                    self.user_data = response.json()
-                    self.is_authenticated = True
-                    self.access_token = self.user_data["access_token"]
-                    await self.get_user_data()
-                    if self.user_data.get("role") == "customer":
-                        yield rx.toast.success("Ingreso exitoso")
-                        yield rx.redirect("/citas")
-                    else:
-                        yield rx.toast.success("Ingreso exitoso")
-                        yield rx.redirect("/dashboard")
+            client = api_client()
+            form_data = {"username": email, "password": password}
+
+            response = await client.post(
+                "/auth/login",
+                data=form_data,
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+            )
+
+            if response.status_code == 200:
+                self.user_data = response.json()
+                self.is_authenticated = True
+                self.access_token = self.user_data["access_token"]
+                await self.get_user_data()
+                if self.user_data.get("role") == "customer":
+                    yield rx.toast.success("Ingreso exitoso")
+                    yield rx.redirect("/citas")
                 else:
-                    error_detail = response.json().get("detail", "Error de ingreso")
-                    yield rx.toast.error(f"Error: {error_detail}")
-                    self.is_authenticated = False
-                    self.user_data = {}
+                    yield rx.toast.success("Ingreso exitoso")
+                    yield rx.redirect("/dashboard")
+            else:
+                error_detail = response.json().get("detail", "Error de ingreso")
+                yield rx.toast.error(f"Error: {error_detail}")
+                self.is_authenticated = False
+                self.user_data = {}
         except httpx.RequestError:
             yield rx.toast.error("Error: Error de conexión al servidor")
             self.is_authenticated = False
@@ -131,3 +130,5 @@ class AuthState(rx.State):
         self.check_auth_protect_login()
         get_services = await self.get_state(ServicesState)
         await get_services.get_services()
+        contact_state = await self.get_state(ContactState)
+        await contact_state.get_business_hours()
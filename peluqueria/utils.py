@@ -1,5 +1,104 @@
+import asyncio
+import time
+from collections.abc import Awaitable
+from http import HTTPStatus
+from typing import Any
+
+import httpx
 import reflex as rx
 
+from peluqueria.api.utils.metrics import histogram
+from peluqueria.constants import MAX_PAGE_SIZE
+
 
 def lang() -> rx.Component:
     return rx.script("document.documentElement.lang = 'es'")
+
+
+async def get_json(client: httpx.AsyncClient, url: str, **kwargs) -> Any:
+    response = await client.get(url, **kwargs)
+    response.raise_for_status()
+    return response.json()
+
+
+async def fetch_all_pages(
+    client: httpx.AsyncClient,
+    url: str,
+    params: dict | None = None,
+    **kwargs,
+) -> list[dict]:
+    """Recorre todas las páginas de un listado de la API siguiendo next_cursor."""
+    params = {"limit": MAX_PAGE_SIZE, **(params or {})}
+    items = []
+
+    while True:
+        response = await client.get(url, params=params, **kwargs)
+        response.raise_for_status()
+        page = response.json()
+        items.extend(page["items"])
+
+        if not page.get("next_cursor"):
+            return items
+        params["cursor"] = page["next_cursor"]
+
+
+async def fetch_all_pages_if_changed(
+    client: httpx.AsyncClient,
+    url: str,
+    etag: str = "",
+    params: dict | None = None,
+) -> tuple[list[dict] | None, str]:
+    """Como fetch_all_pages, pero envía If-None-Match con el ETag anterior.
+
+    Devuelve ``(None, etag)`` si la API responde 304 (el listado no cambió).
+    """
+    params = {"limit": MAX_PAGE_SIZE, **(params or {})}
+    headers = {"If-None-Match": etag} if etag else {}
+
+    response = await client.get(url, params=params, headers=headers)
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        return None, etag
+    response.raise_for_status()
+
+    page = response.json()
+    items = page["items"]
+    if page.get("next_cursor"):
+        items += await fetch_all_pages(
+            client, url, {**params, "cursor": page["next_cursor"]}
+        )
+    return items, response.headers.get("ETag", "")
+
+
+async def _timed(name: str, call: Awaitable) -> Any:
+    started = time.perf_counter()
+    try:
+        return await call
+    finally:
+        histogram(name).observe(time.perf_counter() - started)
+
+
+async def gather_timed(loader: str, **calls: Awaitable) -> dict[str, Any]:
+    """Ejecuta las llamadas de un loader en paralelo.
+
+    Cada resultado es el valor devuelto o la excepción, para que un fallo no
+    descarte el resto. La latencia total y la de cada llamada se registran en
+    los histogramas ``loader_<loader>_seconds`` y ``loader_<loader>_<call>_seconds``.
+    """
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            _timed(f"loader_{loader}_{name}_seconds", call)
+            for name, call in calls.items()
+        ),
+        return_exceptions=True,
+    )
+    histogram(f"loader_{loader}_seconds").observe(time.perf_counter() - started)
+    return dict(zip(calls, results, strict=True))
+
+
+def load_error_message(what: str, error: BaseException) -> str:
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"Error: Error al cargar {what} {error.response.status_code}"
+    if isinstance(error, httpx.RequestError):
+        return "Error: Error de conexión al servidor"
+    return "Error: Error inesperado"
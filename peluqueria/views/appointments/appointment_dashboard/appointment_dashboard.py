@@ -1,14 +1,22 @@
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import TypedDict
 
 import httpx
 import reflex as rx
 
+from peluqueria.api.utils.date_utils import today_co
+from peluqueria.api_client import api_client, auth_headers
 from peluqueria.components.route_guard import authenticated_only_guard
 from peluqueria.constants import HTTP_200_OK, HTTP_201_CREATED
-from peluqueria.settings import Settings
 from peluqueria.state.global_state import AuthState
 from peluqueria.styles.styles import SOLID_BUTTON
+from peluqueria.utils import (
+    fetch_all_pages,
+    fetch_all_pages_if_changed,
+    gather_timed,
+    get_json,
+    load_error_message,
+)
 
 
 def appointment_date_cell(appointment_date: str) -> rx.Component:
@@ -64,19 +72,17 @@ class AppointmentManageState(rx.State):
             if not auth_state.is_authenticated:
                 return
 
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.get(
-                    "/appointments",
-                    headers={"Authorization": f"Bearer {auth_state.access_token}"},
-                )
-
-                if response.status_code == HTTP_200_OK:
-                    self.appointments = response.json()
-                    yield rx.toast.success("Citas cargadas correctamente")
-                else:
-                    yield rx.toast.error(
-                        f"Error: Error en la consulta {response.status_code}",
-                    )
+            client = api_client()
+            self.appointments = await fetch_all_pages(
+                client,
+                "/users/me/appointments",
+                headers=auth_headers(auth_state.access_token),
+            )
+            yield rx.toast.success("Citas cargadas correctamente")
+        except httpx.HTTPStatusError as e:
+            yield rx.toast.error(
+                f"Error: Error en la consulta {e.response.status_code}",
+            )
         except httpx.RequestError:
             yield rx.toast.error("Error: Error de conexión al servidor")
         except Exception:
@@ -85,49 +91,35 @@ class AppointmentManageState(rx.State):
 
 class ServiceState(rx.State):
     services: list[Service] = []
-
-    @rx.event
-    async def get_services(self):
-        try:
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.get("/services")
-
-                if response.status_code == HTTP_200_OK:
-                    self.services = response.json()
-                else:
-                    yield rx.toast.error(
-                        f"Error: Error al cargar servicios {response.status_code}",
-                    )
-        except httpx.RequestError:
-            yield rx.toast.error("Error: Error de conexión al servidor")
-        except Exception:
-            yield rx.toast.error("Error: Error inesperado")
+    services_etag: str = ""
 
 
 class EmployeeState(rx.State):
     employees: list[Employee] = []
 
-    @rx.event
-    async def get_employees(self):
-        try:
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.get("/employees")
-
-                if response.status_code == HTTP_200_OK:
-                    self.employees = response.json()
-                else:
-                    yield rx.toast.error(
-                        f"Error: Error al cargar empleados {response.status_code}",
-                    )
-        except httpx.RequestError:
-            yield rx.toast.error("Error: Error de conexión al servidor")
-        except Exception:
-            yield rx.toast.error("Error: Error inesperado")
+
+class AvailableSlot(TypedDict):
+    value: str
+    label: str
+
+
+class SlotSuggestion(TypedDict):
+    employee_id: str
+    start: str
+    label: str
+
+
+SUGGESTIONS_LIMIT = 5
 
 
 class CreateModalState(rx.State):
     is_modal_open: bool = False
     selected_services: list[str] = []  # noqa: RUF012
+    employee_id: str = ""
+    booking_day: str = ""
+    available_slots: list[AvailableSlot] = []  # noqa: RUF012
+    selected_slot: str = ""
+    suggestions: list[SlotSuggestion] = []  # noqa: RUF012
 
     @rx.var
     def selected_services_count(self) -> int:
@@ -148,10 +140,41 @@ class CreateModalState(rx.State):
         ]
 
     @rx.event
-    def open_modal(self):
+    async def open_modal(self):
         self.is_modal_open = True
         self.selected_services = []
-        return [ServiceState.get_services, EmployeeState.get_employees]
+        self.employee_id = ""
+        self.booking_day = ""
+        self.available_slots = []
+        self.selected_slot = ""
+        self.suggestions = []
+        # Abre el modal antes de esperar los datos
+        yield
+
+        service_state = await self.get_state(ServiceState)
+        employee_state = await self.get_state(EmployeeState)
+        client = api_client()
+        results = await gather_timed(
+            "booking_modal",
+            services=fetch_all_pages_if_changed(
+                client, "/services", service_state.services_etag
+            ),
+            employees=fetch_all_pages(client, "/employees"),
+        )
+
+        services = results["services"]
+        if isinstance(services, Exception):
+            yield rx.toast.error(load_error_message("servicios", services))
+        else:
+            items, service_state.services_etag = services
+            if items is not None:
+                service_state.services = items
+
+        employees = results["employees"]
+        if isinstance(employees, Exception):
+            yield rx.toast.error(load_error_message("empleados", employees))
+        else:
+            employee_state.employees = employees
 
     @rx.event
     def close_modal(self):
@@ -164,10 +187,93 @@ class CreateModalState(rx.State):
             self.selected_services.remove(service_id)
         else:
             self.selected_services.append(service_id)
+        return [CreateModalState.load_availability, CreateModalState.load_suggestions]
 
     @rx.event
     def clear_services(self):
         self.selected_services = []
+        self.available_slots = []
+        self.selected_slot = ""
+        self.suggestions = []
+
+    @rx.event
+    def select_employee(self, employee_id: str):
+        self.employee_id = employee_id
+        return CreateModalState.load_availability
+
+    @rx.event
+    def select_day(self, day: str):
+        self.booking_day = day
+        return CreateModalState.load_availability
+
+    @rx.event
+    def select_slot(self, slot: str):
+        self.selected_slot = slot
+
+    @rx.event
+    def pick_suggestion(self, employee_id: str, start: str):
+        """Llena empleado, día y horario con una sugerencia de la búsqueda."""
+        self.employee_id = employee_id
+        self.booking_day = start[:10]
+        self.selected_slot = start
+        return CreateModalState.load_availability
+
+    @rx.event
+    async def load_suggestions(self):
+        """Busca los primeros horarios libres entre todos los empleados."""
+        self.suggestions = []
+        if not self.selected_services:
+            return
+
+        try:
+            search = await get_json(
+                api_client(),
+                "/availability/search",
+                params={
+                    "service_ids": self.selected_services,
+                    "limit": SUGGESTIONS_LIMIT,
+                },
+            )
+        except Exception as e:
+            yield rx.toast.error(load_error_message("horarios sugeridos", e))
+            return
+
+        self.suggestions = [
+            {
+                "employee_id": item["employee_id"],
+                "start": item["start"],
+                "label": f"{item['employee_name']} · "
+                + datetime.fromisoformat(item["start"]).strftime("%d/%m %I:%M %p"),
+            }
+            for item in search["items"]
+        ]
+
+    @rx.event
+    async def load_availability(self):
+        """Consulta los horarios libres del empleado para los servicios elegidos."""
+        self.available_slots = []
+        if not (self.employee_id and self.booking_day and self.selected_services):
+            return
+
+        try:
+            availability = await get_json(
+                api_client(),
+                f"/employees/{self.employee_id}/availability",
+                params={"day": self.booking_day, "service_ids": self.selected_services},
+            )
+        except Exception as e:
+            yield rx.toast.error(load_error_message("horarios disponibles", e))
+            return
+
+        self.available_slots = [
+            {
+                "value": slot,
+                "label": datetime.fromisoformat(slot).strftime("%I:%M %p"),
+            }
+            for slot in availability["slots"]
+        ]
+        if self.selected_slot not in availability["slots"]:
+            self.selected_slot = ""
 
     @rx.event
     async def create_service(self, form_data: dict):
@@ -190,30 +296,27 @@ class CreateModalState(rx.State):
             form_data["user_id"] = user_id
             form_data["service_ids"] = self.selected_services
 
-            if "appointment_date" in form_data:
-                appointment_date_str = form_data["appointment_date"]
-                appointment_date = datetime.fromisoformat(appointment_date_str)
-                form_data["appointment_date"] = appointment_date.isoformat() + "Z"
+            if not form_data.get("appointment_date"):
+                yield rx.toast.error("Error: Debe seleccionar un horario disponible")
+                return
 
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.post(
-                    "/appointments",
-                    json=form_data,
-                    headers={"Authorization": f"Bearer {auth_state.access_token}"},
+            client = api_client()
+            response = await client.post(
+                "/appointments",
+                json=form_data,
+                headers=auth_headers(auth_state.access_token),
+            )
+
+            if response.status_code == HTTP_201_CREATED:
+                yield rx.toast.success("Cita creada correctamente")
+                self.is_modal_open = False
+                self.selected_services = []
+                yield AppointmentManageState.get_appointments
+            else:
+                error_detail = response.text if response.text else "Error desconocido"
+                yield rx.toast.error(
+                    f"Error {response.status_code}: {error_detail}",
                 )
-
-                if response.status_code == HTTP_201_CREATED:
-                    yield rx.toast.success("Cita creada correctamente")
-                    self.is_modal_open = False
-                    self.selected_services = []
-                    yield AppointmentManageState.get_appointments
-                else:
-                    error_detail = (
-                        response.text if response.text else "Error desconocido"
-                    )
-                    yield rx.toast.error(
-                        f"Error {response.status_code}: {error_detail}",
-                    )
         except httpx.RequestError as e:
             yield rx.toast.error(f"Error de conexión: {e!s}")
         except Exception as e:
@@ -237,25 +340,23 @@ class CancelModalState(rx.State):
                 yield rx.toast.error("Error: Debe iniciar sesión")
                 return
 
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.patch(
-                    f"/appointments/{self.appointment_id}",
-                    json={"state": "cancelled"},
-                    headers={"Authorization": f"Bearer {auth_state.access_token}"},
-                )
-
-                if response.status_code == HTTP_200_OK:
-                    yield rx.toast.success("Cita cancelada correctamente")
-                    yield AppointmentManageState.get_appointments
-                else:
-                    error_msg = "Error al cancelar la cita"
-                    try:
-                        error_detail = response.json().get("detail", error_msg)
-                        yield rx.toast.error(f"Error: {error_detail}")
-                    except Exception:
-                        yield rx.toast.error(
-                            f"Error: {error_msg} ({response.status_code})"
-                        )
+            client = api_client()
+            response = await client.patch(
+                f"/appointments/{self.appointment_id}",
+                json={"state": "cancelled"},
+                headers=auth_headers(auth_state.access_token),
+            )
+
+            if response.status_code == HTTP_200_OK:
+                yield rx.toast.success("Cita cancelada correctamente")
+                yield AppointmentManageState.get_appointments
+            else:
+                error_msg = "Error al cancelar la cita"
+                try:
+                    error_detail = response.json().get("detail", error_msg)
+                    yield rx.toast.error(f"Error: {error_detail}")
+                except Exception:
+                    yield rx.toast.error(f"Error: {error_msg} ({response.status_code})")
         except httpx.RequestError:
             yield rx.toast.error("Error: Error de conexión al servidor")
         except Exception:
@@ -387,6 +488,66 @@ def services_selector() -> rx.Component:
     )
 
 
+def slot_suggestions() -> rx.Component:
+    """Primeros horarios libres entre todos los empleados para los servicios."""
+    return rx.cond(
+        CreateModalState.suggestions,
+        rx.flex(
+            rx.text("Próximos horarios disponibles:", size="2", weight="bold"),
+            rx.flex(
+                rx.foreach(
+                    CreateModalState.suggestions,
+                    lambda suggestion: rx.badge(
+                        suggestion["label"],
+                        rx.icon("clock", size=16),
+                        color_scheme="blue",
+                        radius="full",
+                        size="2",
+                        cursor="pointer",
+                        style={"_hover": {"opacity": 0.75}},
+                        on_click=CreateModalState.pick_suggestion(
+                            suggestion["employee_id"], suggestion["start"]
+                        ),
+                    ),
+                ),
+                wrap="wrap",
+                spacing="2",
+            ),
+            direction="column",
+            spacing="2",
+            width="100%",
+        ),
+    )
+
+
+def available_slots_select() -> rx.Component:
+    # El valor de cada opción es la fecha ISO con zona horaria que devuelve la API
+    return rx.cond(
+        CreateModalState.available_slots,
+        rx.select.root(
+            rx.select.trigger(placeholder="Selecciona un horario"),
+            rx.select.content(
+                rx.select.group(
+                    rx.select.label("Horarios disponibles"),
+                    rx.foreach(
+                        CreateModalState.available_slots,
+                        lambda slot: rx.select.item(slot["label"], value=slot["value"]),
+                    ),
+                ),
+            ),
+            name="appointment_date",
+            required=True,
+            value=CreateModalState.selected_slot,
+            on_change=CreateModalState.select_slot,
+        ),
+        rx.text(
+            "Elige servicios, empleado y día para ver los horarios disponibles",
+            size="2",
+            color_scheme="gray",
+        ),
+    )
+
+
 def create_service() -> rx.Component:
     return rx.dialog.root(
         rx.dialog.content(
@@ -400,6 +561,7 @@ def create_service() -> rx.Component:
             rx.form(
                 rx.flex(
                     services_selector(),
+                    slot_suggestions(),
                     rx.select.root(
                         rx.select.trigger(placeholder="Selecciona un empleado"),
                         rx.select.content(
@@ -417,14 +579,18 @@ def create_service() -> rx.Component:
                         ),
                         name="employee_id",
                         required=True,
+                        value=CreateModalState.employee_id,
+                        on_change=CreateModalState.select_employee,
                     ),
                     rx.input(
-                        type="datetime-local",
-                        name="appointment_date",
+                        type="date",
                         required=True,
-                        placeholder="Selecciona fecha y hora",
-                        min=datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M"),
+                        placeholder="Selecciona el día",
+                        min=today_co().isoformat(),
+                        value=CreateModalState.booking_day,
+                        on_change=CreateModalState.select_day,
                     ),
+                    available_slots_select(),
                     rx.flex(
                         rx.dialog.close(
                             rx.button(
@@ -3,9 +3,10 @@ from typing import TypedDict
 import httpx
 import reflex as rx
 
+from peluqueria.api_client import api_client, auth_headers
+from peluqueria.components.load_more_button import load_more_button
 from peluqueria.components.route_guard import employee_only_guard
-from peluqueria.constants import HTTP_200_OK, HTTP_204_NO_CONTENT
-from peluqueria.settings import Settings
+from peluqueria.constants import HTTP_200_OK, HTTP_204_NO_CONTENT, PAGE_SIZE
 from peluqueria.state.global_state import AuthState
 from peluqueria.styles.styles import SOLID_BUTTON
 
@@ -27,29 +28,47 @@ class Appointment(TypedDict):
 
 class AppointmentsManagerState(rx.State):
     appointments: list[Appointment] = []  # noqa: RUF012
+    next_cursor: str = ""
     loading: bool = False
 
+    @rx.var
+    def has_more_appointments(self) -> bool:
+        return self.next_cursor != ""
+
+    @rx.event
+    def get_appointments(self):
+        self.appointments = []
+        self.next_cursor = ""
+        return AppointmentsManagerState.load_more_appointments
+
     @rx.event
-    async def get_appointments(self):
+    async def load_more_appointments(self):
         self.loading = True
+        params = {"limit": PAGE_SIZE}
+        if self.next_cursor:
+            params["cursor"] = self.next_cursor
+
         try:
             auth_state = await self.get_state(AuthState)
             if not auth_state.is_authenticated:
                 return
 
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.get(
-                    "/appointments",
-                    headers={"Authorization": f"Bearer {auth_state.access_token}"},
-                )
+            client = api_client()
+            response = await client.get(
+                "/appointments",
+                params=params,
+                headers=auth_headers(auth_state.access_token),
+            )
 
-                if response.status_code == HTTP_200_OK:
-                    self.appointments = response.json()
-                    yield rx.toast.success("Citas cargadas correctamente")
-                else:
-                    yield rx.toast.error(
-                        f"Error: Error en la consulta {response.status_code}",
-                    )
+            if response.status_code == HTTP_200_OK:
+                page = response.json()
+                self.appointments = [*self.appointments, *page["items"]]
+                self.next_cursor = page["next_cursor"] or ""
+                yield rx.toast.success("Citas cargadas correctamente")
+            else:
+                yield rx.toast.error(
+                    f"Error: Error en la consulta {response.status_code}",
+                )
         except httpx.RequestError:
             yield rx.toast.error("Error: Error de conexión al servidor")
         except Exception:
@@ -64,19 +83,19 @@ class AppointmentsManagerState(rx.State):
             if not auth_state.is_authenticated:
                 return
 
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.delete(
-                    f"/appointments/{appointment_id}",
-                    headers={"Authorization": f"Bearer {auth_state.access_token}"},
-                )
+            client = api_client()
+            response = await client.delete(
+                f"/appointments/{appointment_id}",
+                headers=auth_headers(auth_state.access_token),
+            )
 
-                if response.status_code == HTTP_204_NO_CONTENT:
-                    yield rx.toast.success("Cita eliminada correctamente")
-                    yield AppointmentsManagerState.get_appointments
-                else:
-                    yield rx.toast.error(
-                        f"Error: No se pudo eliminar la cita {response.status_code}",
-                    )
+            if response.status_code == HTTP_204_NO_CONTENT:
+                yield rx.toast.success("Cita eliminada correctamente")
+                yield AppointmentsManagerState.get_appointments
+            else:
+                yield rx.toast.error(
+                    f"Error: No se pudo eliminar la cita {response.status_code}",
+                )
         except httpx.RequestError:
             yield rx.toast.error("Error: Error de conexión al servidor")
         except Exception:
@@ -89,20 +108,20 @@ class AppointmentsManagerState(rx.State):
             if not auth_state.is_authenticated:
                 return
 
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.patch(
-                    f"/appointments/{appointment_id}",
-                    json={"state": "completed"},
-                    headers={"Authorization": f"Bearer {auth_state.access_token}"},
-                )
+            client = api_client()
+            response = await client.patch(
+                f"/appointments/{appointment_id}",
+                json={"state": "completed"},
+                headers=auth_headers(auth_state.access_token),
+            )
 
-                if response.status_code == HTTP_200_OK:
-                    yield rx.toast.success("Cita marcada como completada")
-                    yield AppointmentsManagerState.get_appointments
-                else:
-                    yield rx.toast.error(
-                        f"Error: No se pudo actualizar la cita {response.status_code}",
-                    )
+            if response.status_code == HTTP_200_OK:
+                yield rx.toast.success("Cita marcada como completada")
+                yield AppointmentsManagerState.get_appointments
+            else:
+                yield rx.toast.error(
+                    f"Error: No se pudo actualizar la cita {response.status_code}",
+                )
         except httpx.RequestError:
             yield rx.toast.error("Error: Error de conexión al servidor")
         except Exception:
@@ -282,6 +301,10 @@ def appointments_table() -> rx.Component:
                 overflow_x="auto",
             ),
         ),
+        load_more_button(
+            AppointmentsManagerState.has_more_appointments,
+            AppointmentsManagerState.load_more_appointments,
+        ),
         width="100%",
         direction="column",
         spacing="3",
@@ -1,10 +1,9 @@
 from typing import TypedDict
 
-import httpx
 import reflex as rx
 
+from peluqueria.api_client import api_client, auth_headers
 from peluqueria.constants import HTTP_200_OK
-from peluqueria.settings import Settings
 from peluqueria.state.global_state import AuthState
 
 
@@ -39,37 +38,21 @@ class ChartsState(rx.State):
             if not auth_state.is_authenticated:
                 return
 
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.get(
-                    "/appointments",
-                    headers={"Authorization": f"Bearer {auth_state.access_token}"},
-                )
-
-                if response.status_code == HTTP_200_OK:
-                    appointments = response.json()
-
-                    completed = 0
-                    pending = 0
-                    confirmed = 0
-                    cancelled = 0
-
-                    for appointment in appointments:
-                        state = appointment.get("state", "").lower()
-                        if state == "completed":
-                            completed += 1
-                        elif state == "pending":
-                            pending += 1
-                        elif state == "confirmed":
-                            confirmed += 1
-                        elif state == "cancelled":
-                            cancelled += 1
-
-                    self.completed_appointments = completed
-                    self.pending_appointments = pending
-                    self.confirmed_appointments = confirmed
-                    self.cancelled_appointments = cancelled
-                else:
-                    yield rx.toast.error("Error al cargar estadísticas de citas")
+            client = api_client()
+            response = await client.get(
+                "/appointments/stats",
+                headers=auth_headers(auth_state.access_token),
+            )
+
+            if response.status_code == HTTP_200_OK:
+                by_state = response.json()["by_state"]
+
+                self.completed_appointments = by_state.get("completed", 0)
+                self.pending_appointments = by_state.get("pending", 0)
+                self.confirmed_appointments = by_state.get("confirmed", 0)
+                self.cancelled_appointments = by_state.get("cancelled", 0)
+            else:
+                yield rx.toast.error("Error al cargar estadísticas de citas")
         except Exception:
             yield rx.toast.error("Error de conexión al cargar estadísticas")
         finally:
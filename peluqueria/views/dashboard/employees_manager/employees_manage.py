@@ -3,6 +3,9 @@ from typing import TypedDict
 import httpx
 import reflex as rx
 
+from peluqueria.api_client import api_client
+from peluqueria.components.load_more_button import load_more_button
+from peluqueria.constants import PAGE_SIZE
 from peluqueria.settings import Settings
 from peluqueria.styles.styles import SOLID_BUTTON
 from peluqueria.views.dashboard.sidebar.sidebar import sidebar
@@ -22,20 +25,37 @@ class User(TypedDict):
 
 class UsersManageState(rx.State):
     users: list[User] = []
+    next_cursor: str = ""
+
+    @rx.var
+    def has_more_users(self) -> bool:
+        return self.next_cursor != ""
+
+    @rx.event
+    def get_users(self):
+        self.users = []
+        self.next_cursor = ""
+        return UsersManageState.load_more_users
 
     @rx.event
-    async def get_users(self):
+    async def load_more_users(self):
+        params = {"limit": PAGE_SIZE}
+        if self.next_cursor:
+            params["cursor"] = self.next_cursor
+
         try:
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.get("/employees")
-
-                if response.status_code == 200:
-                    self.users = response.json()
-                    yield rx.toast.success("Usuarios cargados correctamente")
-                else:
-                    yield rx.toast.error(
-                        f"Error: Error en la consulta {response.status_code}"
-                    )
+            client = api_client()
+            response = await client.get("/employees", params=params)
+
+            if response.status_code == 200:
+                page = response.json()
+                self.users = [*self.users, *page["items"]]
+                self.next_cursor = page["next_cursor"] or ""
+                yield rx.toast.success("Usuarios cargados correctamente")
+            else:
+                yield rx.toast.error(
+                    f"Error: Error en la consulta {response.status_code}"
+                )
         except httpx.RequestError:
             yield rx.toast.error("Error: Error de conexión al servidor")
         except Exception:
@@ -54,30 +74,26 @@ class DeleteModalState(rx.State):
     @rx.event
     async def delete_user(self):
         try:
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                print(f"Intentando eliminar usuario con ID: {self.user_id}")
-                print(
-                    f"URL completa: {Settings.API_BACKEND_URL}/employees/{self.user_id}"
-                )
+            client = api_client()
+            print(f"Intentando eliminar usuario con ID: {self.user_id}")
+            print(f"URL completa: {Settings.API_BACKEND_URL}/employees/{self.user_id}")
+
+            response = await client.delete(f"/employees/{self.user_id}")
+
+            print(f"Código de respuesta: {response.status_code}")
+            print(f"Respuesta completa: {response.text}")
 
-                response = await client.delete(f"/employees/{self.user_id}")
-
-                print(f"Código de respuesta: {response.status_code}")
-                print(f"Respuesta completa: {response.text}")
-
-                if response.status_code == 200:
-                    yield rx.toast.success("Empleado eliminado correctamente")
-                    yield UsersManageState.get_users
-                else:
-                    error_msg = f"Error {response.status_code}"
-                    try:
-                        error_detail = response.json().get(
-                            "detail", "Error desconocido"
-                        )
-                        error_msg = f"Error {response.status_code}: {error_detail}"
-                    except:
-                        pass
-                    yield rx.toast.error(error_msg)
+            if response.status_code == 200:
+                yield rx.toast.success("Empleado eliminado correctamente")
+                yield UsersManageState.get_users
+            else:
+                error_msg = f"Error {response.status_code}"
+                try:
+                    error_detail = response.json().get("detail", "Error desconocido")
+                    error_msg = f"Error {response.status_code}: {error_detail}"
+                except:
+                    pass
+                yield rx.toast.error(error_msg)
         except httpx.RequestError as e:
             print(f"Error de conexión: {e}")
             yield rx.toast.error("Error: Error de conexión al servidor")
@@ -96,16 +112,16 @@ class CreateModalState(rx.State):
             form_data.pop("password2", None)
 
         try:
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.post("/employees", json=form_data)
-
-                if response.status_code == 201:
-                    yield rx.toast.success("Empleado creado correctamente")
-                    yield rx.redirect("/dashboard/employees")
-                else:
-                    yield rx.toast.error(
-                        f"Error: Error en la consulta {response.status_code}",
-                    )
+            client = api_client()
+            response = await client.post("/employees", json=form_data)
+
+            if response.status_code == 201:
+                yield rx.toast.success("Empleado creado correctamente")
+                yield rx.redirect("/dashboard/employees")
+            else:
+                yield rx.toast.error(
+                    f"Error: Error en la consulta {response.status_code}",
+                )
         except httpx.RequestError:
             yield rx.toast.error("Error: Error de conexión al servidor")
         except Exception:
@@ -231,6 +247,10 @@ def users_table() -> rx.Component:
                 rx.table.body(rx.foreach(UsersManageState.users, show_user)),
                 width="100%",
             ),
+            load_more_button(
+                UsersManageState.has_more_users,
+                UsersManageState.load_more_users,
+            ),
             padding_x="2rem",
             padding_y="1rem",
         ),
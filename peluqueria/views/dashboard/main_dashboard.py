@@ -1,16 +1,20 @@
+import asyncio
 from datetime import datetime, timezone
 from typing import TypedDict
 
 import httpx
 import reflex as rx
 
+from peluqueria.api_client import api_client, auth_headers
 from peluqueria.components.route_guard import employee_only_guard
-from peluqueria.settings import Settings
 from peluqueria.state.global_state import AuthState
+from peluqueria.utils import get_json
 from peluqueria.views.dashboard.components.charts import dashboard_charts
 from peluqueria.views.dashboard.sidebar.sidebar import sidebar
 
-HTTP_OK = 200
+HTTP_TOO_MANY_REQUESTS = 429
+REPORT_POLL_INTERVAL = 1
+REPORT_POLL_ATTEMPTS = 60
 
 
 class DashboardMetrics(TypedDict):
@@ -35,51 +39,26 @@ class MainDashboardState(rx.State):
     async def load_dashboard_metrics(self):
         self.is_loading = True
         try:
-            async with httpx.AsyncClient(
-                base_url=Settings.API_BACKEND_URL,
-            ) as client:
-                appointments_response = await client.get("/appointments")
-                users_response = await client.get("/users")
-                employees_response = await client.get("/employees")
-
-                responses = [
-                    appointments_response,
-                    users_response,
-                    employees_response,
-                ]
-                if all(r.status_code == HTTP_OK for r in responses):
-                    appointments = appointments_response.json()
-                    users = users_response.json()
-                    employees = employees_response.json()
-
-                    active_users = len([u for u in users if u.get("is_active", False)])
-
-                    service_usage = {}
-                    for appointment in appointments:
-                        service_name = appointment.get("service_name", "Unknown")
-                        current_count = service_usage.get(service_name, 0)
-                        service_usage[service_name] = current_count + 1
-
-                    most_used_service = "N/A"
-                    if service_usage:
-                        most_used_service = max(
-                            service_usage,
-                            key=lambda x: service_usage[x],
-                        )
-
-                    today = datetime.now(tz=timezone.utc).date().isoformat()
-                    appointments_today = len(
-                        [a for a in appointments if a.get("date", "").startswith(today)]
-                    )
+            auth_state = await self.get_state(AuthState)
+            if not auth_state.is_authenticated:
+                return
 
-                    self.total_appointments = len(appointments)
-                    self.total_users = len(users)
-                    self.total_employees = len(employees)
-                    self.most_used_service = most_used_service
-                    self.appointments_today = appointments_today
-                    self.active_users = active_users
-                else:
-                    yield rx.toast.error("Error al cargar algunas métricas")
+            # Los conteos de usuarios y empleados vienen en las mismas stats
+            stats = await get_json(
+                api_client(),
+                "/appointments/stats",
+                headers=auth_headers(auth_state.access_token),
+            )
+            self.total_appointments = stats["total"]
+            self.appointments_today = stats["day_total"]
+            self.most_used_service = (
+                stats["by_service"][0]["name"] if stats["by_service"] else "N/A"
+            )
+            self.total_users = stats["total_users"]
+            self.active_users = stats["active_users"]
+            self.total_employees = stats["total_employees"]
+        except httpx.HTTPStatusError:
+            yield rx.toast.error("Error al cargar las métricas")
         except httpx.RequestError:
             yield rx.toast.error("Error de conexión al servidor")
         except Exception as e:
@@ -96,20 +75,39 @@ class MainDashboardState(rx.State):
                 yield rx.toast.error("No hay sesión activa")
                 return
 
-            async with httpx.AsyncClient(
-                base_url=Settings.API_BACKEND_URL,
-                headers={"Authorization": f"Bearer {token}"},
-            ) as client:
-                response = await client.get("/dashboard-report")
+            client = api_client()
+            headers = auth_headers(token)
+            response = await client.post("/reports", headers=headers)
+            if response.status_code == HTTP_TOO_MANY_REQUESTS:
+                yield rx.toast.error(response.json()["detail"])
+                return
+            response.raise_for_status()
+            job = response.json()
+
+            yield rx.toast.info("Generando reporte PDF...")
+            for _ in range(REPORT_POLL_ATTEMPTS):
+                if job["status"] in ("done", "failed"):
+                    break
+                await asyncio.sleep(REPORT_POLL_INTERVAL)
+                response = await client.get(f"/reports/{job['id']}", headers=headers)
+                response.raise_for_status()
+                job = response.json()
+
+            if job["status"] != "done":
+                yield rx.toast.error(
+                    job.get("error") or "Error al generar el reporte PDF"
+                )
+                return
 
-                if response.status_code == HTTP_OK:
-                    yield rx.download(
-                        data=response.content,
-                        filename=f"dashboard_report_{datetime.now(tz=timezone.utc).strftime('%Y%m%d_%H%M%S')}.pdf",
-                    )
-                    yield rx.toast.success("Reporte PDF generado exitosamente")
-                else:
-                    yield rx.toast.error("Error al generar el reporte PDF")
+            response = await client.get(f"/reports/{job['id']}/file", headers=headers)
+            response.raise_for_status()
+            yield rx.download(
+                data=response.content,
+                filename=f"dashboard_report_{datetime.now(tz=timezone.utc).strftime('%Y%m%d_%H%M%S')}.pdf",
+            )
+            yield rx.toast.success("Reporte PDF generado exitosamente")
+        except httpx.HTTPStatusError:
+            yield rx.toast.error("Error al generar el reporte PDF")
         except httpx.RequestError:
             yield rx.toast.error("Error de conexión al servidor")
         except Exception as e:
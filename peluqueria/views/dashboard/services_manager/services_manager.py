@@ -3,8 +3,10 @@ from typing import TypedDict
 import httpx
 import reflex as rx
 
+from peluqueria.api_client import api_client
+from peluqueria.components.load_more_button import load_more_button
 from peluqueria.components.route_guard import employee_only_guard
-from peluqueria.settings import Settings
+from peluqueria.constants import PAGE_SIZE
 from peluqueria.styles.styles import SOLID_BUTTON
 from peluqueria.views.dashboard.sidebar.sidebar import sidebar
 
@@ -21,20 +23,37 @@ class Service(TypedDict):
 
 class ServiceManageState(rx.State):
     services: list[Service] = []
+    next_cursor: str = ""
+
+    @rx.var
+    def has_more_services(self) -> bool:
+        return self.next_cursor != ""
+
+    @rx.event
+    def get_services(self):
+        self.services = []
+        self.next_cursor = ""
+        return ServiceManageState.load_more_services
 
     @rx.event
-    async def get_services(self):
+    async def load_more_services(self):
+        params = {"limit": PAGE_SIZE}
+        if self.next_cursor:
+            params["cursor"] = self.next_cursor
+
         try:
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.get("/services")
-
-                if response.status_code == 200:
-                    self.services = response.json()
-                    yield rx.toast.success("Servicios cargados correctamente")
-                else:
-                    yield rx.toast.error(
-                        f"Error: Error en la consulta {response.status_code}"
-                    )
+            client = api_client()
+            response = await client.get("/services", params=params)
+
+            if response.status_code == 200:
+                page = response.json()
+                self.services = [*self.services, *page["items"]]
+                self.next_cursor = page["next_cursor"] or ""
+                yield rx.toast.success("Servicios cargados correctamente")
+            else:
+                yield rx.toast.error(
+                    f"Error: Error en la consulta {response.status_code}"
+                )
         except httpx.RequestError:
             yield rx.toast.error("Error: Error de conexión al servidor")
         except Exception:
@@ -53,18 +72,18 @@ class UpdateModalState(rx.State):
         sanitized_request = {key: value for key, value in form_data.items() if value}
 
         try:
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.patch(
-                    f"/services/{self.service_id}", json=sanitized_request
+            client = api_client()
+            response = await client.patch(
+                f"/services/{self.service_id}", json=sanitized_request
+            )
+
+            if response.status_code == 200:
+                yield rx.toast.success("Servicio actualizado correctamente")
+                yield rx.redirect("/dashboard/services")
+            else:
+                yield rx.toast.error(
+                    f"Error: Error en la consulta {response.status_code}",
                 )
-
-                if response.status_code == 200:
-                    yield rx.toast.success("Servicio actualizado correctamente")
-                    yield rx.redirect("/dashboard/services")
-                else:
-                    yield rx.toast.error(
-                        f"Error: Error en la consulta {response.status_code}",
-                    )
         except httpx.RequestError:
             yield rx.toast.error("Error: Error de conexión al servidor")
         except Exception:
@@ -108,18 +127,18 @@ class CreateModalState(rx.State):
         form_data["img_path"] = self.img_path
 
         try:
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.post("/services", json=form_data)
-
-                if response.status_code == 201:
-                    self.soft_clean_image()
-                    yield rx.toast.success("Servicio creado correctamente")
-                    yield rx.redirect("/dashboard/services")
-                else:
-                    self.clean_image()
-                    yield rx.toast.error(
-                        f"Error: Error en la consulta {response.status_code}",
-                    )
+            client = api_client()
+            response = await client.post("/services", json=form_data)
+
+            if response.status_code == 201:
+                self.soft_clean_image()
+                yield rx.toast.success("Servicio creado correctamente")
+                yield rx.redirect("/dashboard/services")
+            else:
+                self.clean_image()
+                yield rx.toast.error(
+                    f"Error: Error en la consulta {response.status_code}",
+                )
         except httpx.RequestError:
             yield rx.toast.error("Error: Error de conexión al servidor")
             self.clean_image()
@@ -197,6 +216,10 @@ def services_table() -> rx.Component:
             rx.table.body(rx.foreach(ServiceManageState.services, show_service)),
             width="100%",
         ),
+        load_more_button(
+            ServiceManageState.has_more_services,
+            ServiceManageState.load_more_services,
+        ),
         width="100%",
         direction="column",
         spacing="3",
@@ -3,8 +3,10 @@ from typing import TypedDict
 import httpx
 import reflex as rx
 
+from peluqueria.api_client import api_client
+from peluqueria.components.load_more_button import load_more_button
 from peluqueria.components.route_guard import employee_only_guard
-from peluqueria.settings import Settings
+from peluqueria.constants import PAGE_SIZE
 from peluqueria.styles.styles import SOLID_BUTTON
 from peluqueria.views.dashboard.sidebar.sidebar import sidebar
 
@@ -23,20 +25,37 @@ class User(TypedDict):
 
 class UsersManageState(rx.State):
     users: list[User] = []
+    next_cursor: str = ""
+
+    @rx.var
+    def has_more_users(self) -> bool:
+        return self.next_cursor != ""
+
+    @rx.event
+    def get_users(self):
+        self.users = []
+        self.next_cursor = ""
+        return UsersManageState.load_more_users
 
     @rx.event
-    async def get_users(self):
+    async def load_more_users(self):
+        params = {"limit": PAGE_SIZE}
+        if self.next_cursor:
+            params["cursor"] = self.next_cursor
+
         try:
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.get("/users")
+            client = api_client()
+            response = await client.get("/users", params=params)
 
-                if response.status_code == 200:
-                    self.users = response.json()
-                    yield rx.toast.success("Usuarios cargados correctamente")
-                else:
-                    yield rx.toast.error(
-                        f"Error: Error en la consulta {response.status_code}"
-                    )
+            if response.status_code == 200:
+                page = response.json()
+                self.users = [*self.users, *page["items"]]
+                self.next_cursor = page["next_cursor"] or ""
+                yield rx.toast.success("Usuarios cargados correctamente")
+            else:
+                yield rx.toast.error(
+                    f"Error: Error en la consulta {response.status_code}"
+                )
         except httpx.RequestError:
             yield rx.toast.error("Error: Error de conexión al servidor")
         except Exception:
@@ -74,18 +93,18 @@ class ModalState(rx.State):
         sanitized_request["is_active"] = self.select_bool_state
 
         try:
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.patch(
-                    f"/users/{self.user_id}", json=sanitized_request
-                )
+            client = api_client()
+            response = await client.patch(
+                f"/users/{self.user_id}", json=sanitized_request
+            )
 
-                if response.status_code == 200:
-                    yield rx.toast.success("Usuario actualizado correctamente")
-                    yield rx.redirect("/dashboard")
-                else:
-                    yield rx.toast.error(
-                        f"Error: Error en la consulta {response.status_code}"
-                    )
+            if response.status_code == 200:
+                yield rx.toast.success("Usuario actualizado correctamente")
+                yield rx.redirect("/dashboard")
+            else:
+                yield rx.toast.error(
+                    f"Error: Error en la consulta {response.status_code}"
+                )
         except httpx.RequestError:
             yield rx.toast.error("Error: Error de conexión al servidor")
         except Exception:
@@ -94,16 +113,16 @@ class ModalState(rx.State):
     @rx.event
     async def delete_user(self):
         try:
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.delete(f"/users/{self.user_id}")
+            client = api_client()
+            response = await client.delete(f"/users/{self.user_id}")
 
-                if response.status_code == 200:
-                    yield rx.toast.success("Usuario eliminado correctamente")
-                    yield rx.redirect("/dashboard")
-                else:
-                    yield rx.toast.error(
-                        f"Error: Error en la consulta {response.status_code}"
-                    )
+            if response.status_code == 200:
+                yield rx.toast.success("Usuario eliminado correctamente")
+                yield rx.redirect("/dashboard")
+            else:
+                yield rx.toast.error(
+                    f"Error: Error en la consulta {response.status_code}"
+                )
         except httpx.RequestError:
             yield rx.toast.error("Error: Error de conexión al servidor")
         except Exception:
@@ -282,6 +301,10 @@ def users_table() -> rx.Component:
                 rx.table.body(rx.foreach(UsersManageState.users, show_user)),
                 width="100%",
             ),
+            load_more_button(
+                UsersManageState.has_more_users,
+                UsersManageState.load_more_users,
+            ),
             padding_x="2rem",
             padding_y="1rem",
         ),
@@ -1,8 +1,90 @@
+from datetime import date
+
+import httpx
 import reflex as rx
 
+from peluqueria.api_client import api_client
 from peluqueria.components.form_field import form_field
 from peluqueria.components.social_icon import social_icon
 from peluqueria.styles.styles import CUSTOM_INPUT, SOLID_BUTTON, Colors
+from peluqueria.utils import get_json
+
+WEEKDAYS = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+
+
+def format_hour(value: str) -> str:
+    hour, minute = (int(part) for part in value.split(":")[:2])
+    return f"{hour % 12 or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+def format_intervals(intervals: list[dict]) -> str:
+    if not intervals:
+        return "Cerrado"
+    return ", ".join(
+        f"{format_hour(interval['start'])} - {format_hour(interval['end'])}"
+        for interval in intervals
+    )
+
+
+def group_day_hours(day_hours: list[dict]) -> list[dict[str, str]]:
+    """Agrupa por día de la semana el horario de los próximos siete días.
+
+    Los días seguidos con el mismo horario se unen ("Lunes - Viernes"); un
+    festivo se muestra aparte con su fecha y nombre.
+    """
+    by_weekday = {date.fromisoformat(day["day"]).weekday(): day for day in day_hours}
+    groups: list[tuple[int, int, str, str | None]] = []
+    for weekday in sorted(by_weekday):
+        day = by_weekday[weekday]
+        hours = format_intervals(day["intervals"])
+        if day.get("holiday"):
+            holiday_date = date.fromisoformat(day["day"])
+            label = (
+                f"{WEEKDAYS[weekday]} {holiday_date.day}/{holiday_date.month} "
+                f"({day['holiday']})"
+            )
+            groups.append((weekday, weekday, hours, label))
+        elif groups and groups[-1][3] is None and groups[-1][2] == hours:
+            groups[-1] = (groups[-1][0], weekday, hours, None)
+        else:
+            groups.append((weekday, weekday, hours, None))
+
+    return [
+        {
+            "days": label
+            or (
+                WEEKDAYS[first]
+                if first == last
+                else f"{WEEKDAYS[first]} - {WEEKDAYS[last]}"
+            ),
+            "hours": hours,
+        }
+        for first, last, hours, label in groups
+    ]
+
+
+class ContactState(rx.State):
+    # Se muestra el horario por defecto hasta que responda la API
+    business_hours: list[dict[str, str]] = [  # noqa: RUF012
+        {"days": "Lunes - Viernes", "hours": "9:00 AM - 8:00 PM"},
+        {"days": "Sábado", "hours": "9:00 AM - 6:00 PM"},
+        {"days": "Domingo", "hours": "10:00 AM - 5:00 PM"},
+    ]
+
+    @rx.event
+    async def get_business_hours(self):
+        try:
+            # Tabla ya compilada: festivos y horario aplicados a cada día
+            day_hours = await get_json(
+                api_client(), "/calendar/hours", params={"days": 7}
+            )
+            self.business_hours = group_day_hours(day_hours)
+        except httpx.HTTPStatusError as e:
+            print(f"Error al cargar el horario: {e.response.status_code}")
+        except httpx.RequestError:
+            print("Error de conexión al servidor")
+        except Exception:
+            print("Error inesperado al cargar el horario")
 
 
 def info_field(icon: str, title: str, text: str) -> rx.Component:
@@ -93,9 +175,10 @@ def contact() -> rx.Component:
                 ),
                 rx.vstack(
                     rx.heading("Horario de atención", as_="h3", size="5"),
-                    time_field("Lunes - Viernes", "9:00 AM - 8:00 PM"),
-                    time_field("Sábado", "9:00 AM - 6:00 PM"),
-                    time_field("Domingo", "10:00 AM - 5:00 PM"),
+                    rx.foreach(
+                        ContactState.business_hours,
+                        lambda row: time_field(row["days"], row["hours"]),
+                    ),
                     width="100%",
                 ),
                 rx.vstack(
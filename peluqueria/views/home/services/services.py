@@ -3,29 +3,34 @@ import os
 import httpx
 import reflex as rx
 
-from peluqueria.settings import Settings
+from peluqueria.api_client import api_client
 from peluqueria.styles.styles import Colors
+from peluqueria.utils import fetch_all_pages_if_changed
 
 
 class ServicesState(rx.State):
     list_services: list[dict[str, str]] = []
+    services_etag: str = ""
 
     @rx.event
     async def get_services(self):
         try:
-            async with httpx.AsyncClient(base_url=Settings.API_BACKEND_URL) as client:
-                response = await client.get("/services")
-                if response.status_code == 200:
-                    self.list_services = [
-                        {
-                            "title": service["name"],
-                            "text": service["description"],
-                            "img": os.path.basename(service["img_path"]),
-                        }
-                        for service in response.json()
-                    ]
-                else:
-                    print(f"Error al cargar los servicios: {response.status_code}")
+            client = api_client()
+            services, self.services_etag = await fetch_all_pages_if_changed(
+                client, "/services", self.services_etag
+            )
+            if services is None:
+                return
+            self.list_services = [
+                {
+                    "title": service["name"],
+                    "text": service["description"],
+                    "img": os.path.basename(service["img_path"]),
+                }
+                for service in services
+            ]
+        except httpx.HTTPStatusError as e:
+            print(f"Error al cargar los servicios: {e.response.status_code}")
         except httpx.RequestError:
             print("Error de conexión al servidor")
         except Exception:
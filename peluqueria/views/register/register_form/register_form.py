@@ -3,10 +3,10 @@ import re
 import httpx
 import reflex as rx
 
+from peluqueria.api_client import api_client
 from peluqueria.components.form_field_password import form_field_password
 from peluqueria.components.form_field_state import form_field_state
 from peluqueria.constants import EMAIL_REGEX, PHONE_REGEX
-from peluqueria.settings import Settings
 from peluqueria.styles.styles import SOLID_BUTTON, Colors
 
 
@@ -77,14 +77,11 @@ class RegisterState(rx.State):
             form_data["first_name"] = form_data["first_name"].capitalize()
             form_data["last_name"] = form_data["last_name"].capitalize()
             try:
-                async with httpx.AsyncClient(
-                    base_url=Settings.API_BACKEND_URL
-                ) as client:
-                    response = await client.post(
-                        "/users",
-                        json=form_data,
-                        timeout=10.0,
-                    )
+                client = api_client()
+                response = await client.post(
+                    "/users",
+                    json=form_data,
+                )
 
                 if response.status_code == 201:
                     yield rx.toast.success("Usuario creado exitosamente.")
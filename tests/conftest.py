@@ -0,0 +1,139 @@
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from bson import ObjectId
+
+from peluqueria.api.db import db_connect
+from peluqueria.api.main import fastapi_app
+from peluqueria.api.routers.auth import create_access_token
+from peluqueria.api.utils.availability import occupancy_cache
+from peluqueria.api.utils.business_calendar import business_calendar
+from peluqueria.api.utils.date_utils import CO_TZ
+from peluqueria.api.utils.service_utils import service_catalog
+from peluqueria.api.utils.user_utils import principal_cache
+from tests.fake_db import FakeDatabase
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        help="Ejecuta también las pruebas de rendimiento (marca benchmark).",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark: mide tiempos; solo corre con --benchmark"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    # Los tiempos dependen de la máquina: fuera de --benchmark no se ejecutan
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="prueba de rendimiento; usa --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Reemplaza la base de datos de todos los módulos de la API por una en memoria."""
+    database, real_db = FakeDatabase(), db_connect.db
+    for module in list(sys.modules.values()):
+        if module.__name__.startswith("peluqueria") and (
+            getattr(module, "db", None) is real_db
+        ):
+            monkeypatch.setattr(module, "db", database)
+
+    # Cada prueba corre en su propio event loop
+    for store in (service_catalog, business_calendar):
+        monkeypatch.setattr(store, "_lock", asyncio.Lock())
+        store.invalidate()
+    occupancy_cache.clear()
+    principal_cache.clear()
+    return database
+
+
+@pytest.fixture
+async def client(fake_db):
+    transport = httpx.ASGITransport(app=fastapi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+        yield api
+
+
+def auth_headers(role: str, uid: str | None = None) -> dict[str, str]:
+    """Token válido; con ``uid`` de una cuenta existente también pasa require_fresh_token."""
+    token = create_access_token(
+        {
+            "sub": f"{role}@example.com",
+            "uid": uid or str(ObjectId()),
+            "role": role,
+            "ver": 0,
+        }
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def booking_data(fake_db):
+    """Un cliente, dos empleados y dos servicios: Corte (30 min) y Tinte (60 min)."""
+    user_id, service_id, long_service_id = ObjectId(), ObjectId(), ObjectId()
+    employee_ids = [ObjectId(), ObjectId()]
+    fake_db.users.docs.append(
+        {"_id": user_id, "first_name": "Ana", "last_name": "Gómez", "role": "customer"}
+    )
+    fake_db.employees.docs.extend(
+        {"_id": employee_id, "first_name": "Luis", "last_name": "Pérez"}
+        for employee_id in employee_ids
+    )
+    fake_db.services.docs.extend(
+        [
+            {
+                "_id": service_id,
+                "name": "Corte",
+                "price": 20000,
+                "duration_minutes": 30,
+            },
+            {
+                "_id": long_service_id,
+                "name": "Tinte",
+                "price": 50000,
+                "duration_minutes": 60,
+            },
+        ]
+    )
+    return {
+        "user_id": str(user_id),
+        "employee_ids": [str(employee_id) for employee_id in employee_ids],
+        "service_id": str(service_id),
+        "long_service_id": str(long_service_id),
+    }
+
+
+def next_tuesday(hour: int, minute: int = 0) -> datetime:
+    """Un martes futuro a esa hora de Colombia, dentro del horario por defecto."""
+    today = datetime.now(CO_TZ).date()
+    day = today + timedelta(days=(1 - today.weekday()) % 7 or 7)
+    return datetime(
+        day.year, day.month, day.day, hour, minute, tzinfo=CO_TZ
+    ).astimezone(timezone.utc)
+
+
+def booking(booking_data: dict, employee_id: str, start: datetime) -> dict:
+    return {
+        "user_id": booking_data["user_id"],
+        "employee_id": employee_id,
+        "service_ids": [booking_data["service_id"]],
+        "appointment_date": start.isoformat(),
+    }
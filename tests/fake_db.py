@@ -0,0 +1,481 @@
+"""Base de datos Mongo en memoria para las pruebas de la API.
+
+Implementa solo las operaciones que usa la API, con los índices únicos de
+``INDEX_REGISTRY``. Cada operación cede el event loop una vez, como lo haría
+un viaje a Mongo, y suma uno en ``round_trips``.
+
+``aggregate`` ejecuta las etapas y expresiones que usan los pipelines de
+backfill e identities ($lookup con pipeline, $set, $map, $filter, ...); una
+etapa u operador que no conoce lanza NotImplementedError.
+"""
+
+import asyncio
+import copy
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+from peluqueria.api.db.indexes import INDEX_REGISTRY
+
+DUPLICATE_KEY = 11000
+
+
+def _compare(value: Any, operator: str, expected: Any) -> bool:
+    if operator == "$in":
+        if isinstance(value, list):
+            return any(item in expected for item in value)
+        return value in expected
+    if operator == "$nin":
+        return not _compare(value, "$in", expected)
+    if operator == "$ne":
+        return value != expected
+    if operator == "$exists":
+        return (value is not None) == expected
+    if operator == "$type":
+        return expected == "string" and isinstance(value, str)
+    if value is None:
+        return False
+    if operator == "$gt":
+        return value > expected
+    if operator == "$gte":
+        return value >= expected
+    if operator == "$lt":
+        return value < expected
+    if operator == "$lte":
+        return value <= expected
+    raise NotImplementedError(operator)
+
+
+def matches(doc: dict, query: dict, variables: dict | None = None) -> bool:
+    for key, condition in query.items():
+        if key == "$expr":
+            if not evaluate(condition, doc, variables or {}):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, branch, variables) for branch in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, branch, variables) for branch in condition):
+                return False
+        elif isinstance(condition, dict) and all(
+            operator.startswith("$") for operator in condition
+        ):
+            if not all(
+                _compare(doc.get(key), operator, expected)
+                for operator, expected in condition.items()
+            ):
+                return False
+        elif isinstance(doc.get(key), list) and not isinstance(condition, list):
+            if condition not in doc[key]:
+                return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+def _path(value: Any, path: list[str]) -> Any:
+    for index, part in enumerate(path):
+        if isinstance(value, list):
+            # "$lista.campo" devuelve el campo de cada elemento
+            return [
+                item
+                for item in (_path(element, path[index:]) for element in value)
+                if item is not None
+            ]
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _to_object_id(value: Any, on_error: Any) -> Any:
+    if value is None or isinstance(value, ObjectId):
+        return value
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return on_error
+
+
+def _to_date(value: Any) -> Any:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime) and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def evaluate(expression: Any, doc: dict, variables: dict) -> Any:
+    """Evalúa una expresión de agregación sobre ``doc``."""
+    if isinstance(expression, str) and expression.startswith("$$"):
+        name, *path = expression[2:].split(".")
+        return _path(variables[name], path)
+    if isinstance(expression, str) and expression.startswith("$"):
+        return _path(doc, expression[1:].split("."))
+    if isinstance(expression, list):
+        return [evaluate(item, doc, variables) for item in expression]
+    if not isinstance(expression, dict):
+        return expression
+    if not expression or not next(iter(expression)).startswith("$"):
+        return {
+            key: evaluate(value, doc, variables) for key, value in expression.items()
+        }
+
+    ((operator, argument),) = expression.items()
+
+    def arg(value: Any, **extra: Any) -> Any:
+        return evaluate(value, doc, {**variables, **extra})
+
+    if operator == "$literal":
+        return argument
+    if operator == "$ifNull":
+        for value in argument:
+            value = arg(value)
+            if value is not None:
+                return value
+        return None
+    if operator == "$cond":
+        condition, then, otherwise = argument
+        return arg(then) if arg(condition) else arg(otherwise)
+    if operator == "$eq":
+        left, right = arg(argument)
+        return left == right
+    if operator == "$in":
+        value, values = arg(argument)
+        return value in values
+    if operator == "$first":
+        values = arg(argument)
+        return values[0] if values else None
+    if operator == "$concat":
+        values = arg(argument)
+        return None if None in values else "".join(values)
+    if operator == "$concatArrays":
+        return [item for values in arg(argument) for item in values]
+    if operator == "$sum":
+        values = arg(argument)
+        return sum(value for value in values if isinstance(value, int | float))
+    if operator == "$convert":
+        if argument["to"] != "objectId":
+            raise NotImplementedError(f"$convert to {argument['to']}")
+        value = arg(argument["input"])
+        if value is None:
+            return arg(argument.get("onNull"))
+        return _to_object_id(value, arg(argument.get("onError")))
+    if operator == "$toDate":
+        return _to_date(arg(argument))
+    if operator == "$dateAdd":
+        if argument["unit"] != "minute":
+            raise NotImplementedError(f"$dateAdd unit {argument['unit']}")
+        return arg(argument["startDate"]) + timedelta(minutes=arg(argument["amount"]))
+    if operator == "$map":
+        name = argument.get("as", "this")
+        values = arg(argument["input"]) or []
+        return [arg(argument["in"], **{name: value}) for value in values]
+    if operator == "$filter":
+        name = argument.get("as", "this")
+        values = arg(argument["input"]) or []
+        return [value for value in values if arg(argument["cond"], **{name: value})]
+    if operator == "$let":
+        bound = {name: arg(value) for name, value in argument["vars"].items()}
+        return arg(argument["in"], **bound)
+    raise NotImplementedError(operator)
+
+
+def project(doc: dict, projection: dict | None) -> dict:
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    if any(value for key, value in projection.items() if key != "_id"):
+        fields = {key for key, value in projection.items() if value}
+        if projection.get("_id", 1):
+            fields.add("_id")
+        return {key: value for key, value in doc.items() if key in fields}
+    return {key: value for key, value in doc.items() if projection.get(key, 1)}
+
+
+def _project_stage(doc: dict, projection: dict, variables: dict) -> dict:
+    """$project de agregación: además de incluir o excluir admite expresiones."""
+    computed = {
+        key: evaluate(value, doc, variables)
+        for key, value in projection.items()
+        if not isinstance(value, bool | int)
+    }
+    included = {
+        key
+        for key, value in projection.items()
+        if isinstance(value, bool | int) and value
+    }
+    if not computed and not included - {"_id"}:
+        return project(doc, projection)
+
+    if projection.get("_id", 1):
+        included.add("_id")
+    return {
+        **{key: value for key, value in doc.items() if key in included},
+        **computed,
+    }
+
+
+@dataclass
+class Result:
+    inserted_id: Any = None
+    deleted_count: int = 0
+    matched_count: int = 0
+    modified_count: int = 0
+    upserted_count: int = 0
+
+
+class FakeCursor:
+    def __init__(
+        self, database: "FakeDatabase", docs: list[dict], fetched: bool = False
+    ) -> None:
+        self._database = database
+        self._docs = docs
+        self._limit = 0
+        # El cursor de aggregate ya trae los resultados con el comando
+        self._fetched = fetched
+
+    def sort(self, key: str | list, direction: int = 1) -> "FakeCursor":
+        keys = [(key, direction)] if isinstance(key, str) else key
+        for field, field_direction in reversed(keys):
+            self._docs.sort(
+                key=lambda doc: (doc.get(field) is not None, doc.get(field)),
+                reverse=field_direction < 0,
+            )
+        return self
+
+    def limit(self, limit: int) -> "FakeCursor":
+        self._limit = limit
+        return self
+
+    async def to_list(self, length: int | None = None) -> list[dict]:
+        if not self._fetched:
+            await self._database.round_trip()
+        docs = self._docs[: self._limit] if self._limit else self._docs
+        return docs[:length] if length else docs
+
+    async def __aiter__(self):
+        for doc in await self.to_list(None):
+            yield doc
+
+
+class FakeCollection:
+    def __init__(self, database: "FakeDatabase", name: str) -> None:
+        self.database = database
+        self.name = name
+        self.docs: list[dict] = []
+        self.index_names: list[str] = []
+        self.unique_keys = [
+            tuple(field for field, _ in index["keys"])
+            for index in INDEX_REGISTRY.get(name, [])
+            if index.get("unique")
+        ]
+
+    def _check_unique(self, doc: dict) -> None:
+        for keys in [("_id",), *self.unique_keys]:
+            value = tuple(doc.get(field) for field in keys)
+            if any(
+                tuple(other.get(field) for field in keys) == value
+                for other in self.docs
+            ):
+                raise DuplicateKeyError(f"E11000 duplicate key {keys}: {value}")
+
+    def _insert(self, doc: dict) -> Any:
+        doc = copy.deepcopy(doc)
+        doc.setdefault("_id", ObjectId())
+        self._check_unique(doc)
+        self.docs.append(doc)
+        return doc["_id"]
+
+    def _matching(self, query: dict | None) -> list[dict]:
+        return [doc for doc in self.docs if matches(doc, query or {})]
+
+    def find(self, query: dict | None = None, projection: dict | None = None):
+        return FakeCursor(
+            self.database,
+            [project(doc, projection) for doc in self._matching(query)],
+        )
+
+    async def find_one(self, query: dict | None = None, projection: dict | None = None):
+        await self.database.round_trip()
+        found = self._matching(query)
+        return project(found[0], projection) if found else None
+
+    def _run_pipeline(
+        self, docs: list[dict], pipeline: list[dict], variables: dict
+    ) -> list[dict]:
+        for stage in pipeline:
+            ((name, spec),) = stage.items()
+            if name == "$match":
+                docs = [doc for doc in docs if matches(doc, spec, variables)]
+            elif name == "$sort":
+                docs = FakeCursor(self.database, docs).sort(list(spec.items()))._docs
+            elif name == "$limit":
+                docs = docs[:spec]
+            elif name == "$project":
+                docs = [_project_stage(doc, spec, variables) for doc in docs]
+            elif name == "$set":
+                # Todas las expresiones se evalúan sobre el documento de entrada
+                docs = [
+                    {
+                        **doc,
+                        **{
+                            key: evaluate(value, doc, variables)
+                            for key, value in spec.items()
+                        },
+                    }
+                    for doc in docs
+                ]
+            elif name == "$unset":
+                fields = [spec] if isinstance(spec, str) else spec
+                docs = [
+                    {key: value for key, value in doc.items() if key not in fields}
+                    for doc in docs
+                ]
+            elif name == "$replaceWith":
+                docs = [evaluate(spec, doc, variables) for doc in docs]
+            elif name == "$lookup":
+                foreign = self.database[spec["from"]]
+                docs = [
+                    {
+                        **doc,
+                        spec["as"]: foreign._run_pipeline(
+                            [copy.deepcopy(other) for other in foreign.docs],
+                            spec["pipeline"],
+                            {
+                                key: evaluate(value, doc, variables)
+                                for key, value in spec.get("let", {}).items()
+                            },
+                        ),
+                    }
+                    for doc in docs
+                ]
+            else:
+                raise NotImplementedError(name)
+        return docs
+
+    async def aggregate(self, pipeline: list[dict]) -> FakeCursor:
+        await self.database.round_trip()
+        docs = self._run_pipeline(
+            [copy.deepcopy(doc) for doc in self.docs], pipeline, {}
+        )
+        return FakeCursor(self.database, docs, fetched=True)
+
+    async def create_indexes(self, models: list) -> list[str]:
+        await self.database.round_trip()
+        for model in models:
+            keys = tuple(model.document["key"])
+            values = [tuple(doc.get(field) for field in keys) for doc in self.docs]
+            if model.document.get("unique") and len(set(values)) < len(values):
+                raise OperationFailure(
+                    f"E11000 duplicate key {keys}", code=DUPLICATE_KEY
+                )
+        names = [model.document["name"] for model in models]
+        self.index_names.extend(names)
+        return names
+
+    async def count_documents(self, query: dict) -> int:
+        await self.database.round_trip()
+        return len(self._matching(query))
+
+    async def estimated_document_count(self) -> int:
+        await self.database.round_trip()
+        return len(self.docs)
+
+    async def insert_one(self, doc: dict) -> Result:
+        await self.database.round_trip()
+        return Result(inserted_id=self._insert(doc))
+
+    async def insert_many(self, docs: list[dict], ordered: bool = True) -> Result:
+        await self.database.round_trip()
+        for index, doc in enumerate(docs):
+            try:
+                self._insert(doc)
+            except DuplicateKeyError as exc:
+                raise BulkWriteError(
+                    {
+                        "writeErrors": [
+                            {"index": index, "code": DUPLICATE_KEY, "errmsg": str(exc)}
+                        ],
+                        "nInserted": index,
+                    }
+                ) from exc
+            # Otra operación puede colarse entre documento y documento
+            await asyncio.sleep(0)
+        return Result()
+
+    def _update(self, query: dict, update: dict, upsert: bool) -> Result:
+        found = self._matching(query)
+        if not found:
+            if not upsert:
+                return Result()
+            doc = {
+                key: value for key, value in query.items() if not key.startswith("$")
+            }
+            self._insert(doc)
+            found = [self.docs[-1]]
+            result = Result(upserted_count=1)
+        else:
+            result = Result(matched_count=1, modified_count=1)
+
+        doc = found[0]
+        doc.update(update.get("$set", {}))
+        for field, amount in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + amount
+        return result
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False):
+        await self.database.round_trip()
+        return self._update(query, update, upsert)
+
+    async def replace_one(self, query: dict, doc: dict, upsert: bool = False):
+        await self.database.round_trip()
+        self.docs = [other for other in self.docs if not matches(other, query)]
+        self._insert({**doc, "_id": query.get("_id", doc.get("_id"))})
+        return Result(matched_count=1)
+
+    async def bulk_write(self, requests: list, ordered: bool = True) -> Result:
+        """Solo UpdateOne, que es lo que usan el rollup y el backfill."""
+        await self.database.round_trip()
+        total = Result()
+        for request in requests:
+            result = self._update(request._filter, request._doc, request._upsert)
+            total.modified_count += result.modified_count
+            total.upserted_count += result.upserted_count
+        return total
+
+    async def delete_one(self, query: dict) -> Result:
+        await self.database.round_trip()
+        found = self._matching(query)[:1]
+        self.docs = [doc for doc in self.docs if doc not in found]
+        return Result(deleted_count=len(found))
+
+    async def delete_many(self, query: dict) -> Result:
+        await self.database.round_trip()
+        found = self._matching(query)
+        self.docs = [doc for doc in self.docs if doc not in found]
+        return Result(deleted_count=len(found))
+
+
+class FakeDatabase:
+    def __init__(self) -> None:
+        self.collections: dict[str, FakeCollection] = {}
+        self.round_trips = 0
+
+    async def round_trip(self) -> None:
+        self.round_trips += 1
+        await asyncio.sleep(0)
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        if name not in self.collections:
+            self.collections[name] = FakeCollection(self, name)
+        return self.collections[name]
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
@@ -0,0 +1,27 @@
+import pytest
+
+from tests.conftest import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_listing_appointments_requires_a_token(client):
+    response = await client.get("/appointments")
+    assert response.status_code == 401
+
+
+async def test_customers_cannot_list_every_appointment(client):
+    response = await client.get("/appointments", headers=auth_headers("customer"))
+    assert response.status_code == 403
+
+
+async def test_employees_can_list_appointments(client):
+    response = await client.get("/appointments", headers=auth_headers("employee"))
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "next_cursor": None}
+
+
+async def test_stats_require_an_employee_token(client):
+    assert (await client.get("/appointments/stats")).status_code == 401
+    response = await client.get("/appointments/stats", headers=auth_headers("customer"))
+    assert response.status_code == 403
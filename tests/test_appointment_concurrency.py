@@ -0,0 +1,67 @@
+import asyncio
+from collections import Counter
+from datetime import timedelta
+
+import pytest
+
+from peluqueria.api.db.slots import SLOT_COLLECTION
+from tests.conftest import booking, next_tuesday
+
+pytestmark = pytest.mark.anyio
+
+CONCURRENT_BOOKINGS = 300
+
+
+async def test_concurrent_bookings_for_one_slot_only_one_wins(
+    client, fake_db, booking_data
+):
+    payload = booking(booking_data, booking_data["employee_ids"][0], next_tuesday(10))
+
+    responses = await asyncio.gather(
+        *(
+            client.post("/appointments", json=payload)
+            for _ in range(CONCURRENT_BOOKINGS)
+        )
+    )
+
+    statuses = Counter(response.status_code for response in responses)
+    assert statuses == {201: 1, 409: CONCURRENT_BOOKINGS - 1}
+    assert len(fake_db.appointments.docs) == 1
+    # Los perdedores no dejan slots reservados: 30 minutos son 6 slots
+    assert len(fake_db[SLOT_COLLECTION].docs) == 6
+
+
+async def test_overlapping_bookings_conflict(client, booking_data):
+    employee_id = booking_data["employee_ids"][0]
+    start = next_tuesday(10)
+
+    responses = await asyncio.gather(
+        *(
+            client.post(
+                "/appointments",
+                json=booking(booking_data, employee_id, start + timedelta(minutes=m)),
+            )
+            for m in (0, 10, 20)
+        )
+    )
+
+    assert sorted(response.status_code for response in responses) == [201, 409, 409]
+
+
+async def test_concurrent_bookings_for_other_employees_and_slots_succeed(
+    client, fake_db, booking_data
+):
+    # Cada empleado, cada media hora de 9:00 a 19:30
+    payloads = [
+        booking(booking_data, employee_id, next_tuesday(9) + timedelta(minutes=30 * i))
+        for employee_id in booking_data["employee_ids"]
+        for i in range(22)
+    ]
+
+    responses = await asyncio.gather(
+        *(client.post("/appointments", json=payload) for payload in payloads)
+    )
+
+    assert [response.status_code for response in responses] == [201] * len(payloads)
+    assert len(fake_db.appointments.docs) == len(payloads)
+    assert len(fake_db[SLOT_COLLECTION].docs) == 6 * len(payloads)
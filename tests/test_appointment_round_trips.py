@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+from peluqueria.api.db.backfill import backfill_appointment_names
+from tests.conftest import auth_headers
+from tests.fake_db import FakeDatabase
+
+pytestmark = pytest.mark.anyio
+
+SIZES = (10, 1000)
+
+
+def seed_appointments(fake_db: FakeDatabase, count: int, **fields) -> None:
+    start = datetime(2030, 1, 1, 15, tzinfo=timezone.utc)
+    fake_db.appointments.docs.extend(
+        {
+            "_id": ObjectId(),
+            "user_id": str(ObjectId()),
+            "employee_id": str(ObjectId()),
+            "service_ids": [str(ObjectId())],
+            "appointment_date": start + timedelta(minutes=30 * index),
+            "end_date": start + timedelta(minutes=30 * (index + 1)),
+            "total_duration_minutes": 30,
+            "user_name": "Ana Gómez",
+            "employee_name": "Luis Pérez",
+            "service_names": ["Corte"],
+            "created_at": start,
+            "updated_at": start,
+            "state": "pending",
+            "total_cost": 20000.0,
+            **fields,
+        }
+        for index in range(count)
+    )
+
+
+async def test_get_appointments_round_trips_do_not_grow(client, fake_db):
+    round_trips = []
+    for count in SIZES:
+        fake_db.appointments.docs.clear()
+        seed_appointments(fake_db, count)
+
+        before = fake_db.round_trips
+        response = await client.get(
+            "/appointments", params={"limit": 100}, headers=auth_headers("employee")
+        )
+        round_trips.append(fake_db.round_trips - before)
+
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == min(count, 100)
+
+    assert round_trips == [1, 1]
+
+
+async def test_backfill_round_trips_do_not_grow(fake_db):
+    round_trips = []
+    for count in SIZES:
+        fake_db.appointments.docs.clear()
+        # Citas antiguas sin user_name, que el backfill debe completar
+        seed_appointments(fake_db, count, user_name="")
+
+        before = fake_db.round_trips
+        repaired = await backfill_appointment_names(batch_size=1000, restart=True)
+        round_trips.append(fake_db.round_trips - before)
+
+        assert repaired == count
+
+    # Un lote con su bulk_write y checkpoint, la consulta vacía y el borrado
+    # del checkpoint, sin importar cuántas citas haya
+    assert round_trips[0] == round_trips[1] == 5
+
+
+async def test_backfill_resolves_names_in_service_ids_order(fake_db):
+    user_id, employee_id = ObjectId(), ObjectId()
+    corte, tinte = ObjectId(), ObjectId()
+    fake_db.users.docs.append(
+        {"_id": user_id, "first_name": "Ana", "last_name": "Gómez"}
+    )
+    fake_db.employees.docs.append(
+        {"_id": employee_id, "first_name": "Luis", "last_name": "Pérez"}
+    )
+    fake_db.services.docs.extend(
+        [
+            {"_id": corte, "name": "Corte", "duration_minutes": 30},
+            {"_id": tinte, "name": "Tinte", "duration_minutes": 60},
+        ]
+    )
+    legacy_id, orphan_id = ObjectId(), ObjectId()
+    fake_db.appointments.docs.extend(
+        [
+            {
+                "_id": legacy_id,
+                "user_id": str(user_id),
+                "employee_id": str(employee_id),
+                # Orden distinto al de la colección, con un repetido, un id
+                # que no existe y uno inválido
+                "service_ids": [
+                    str(tinte),
+                    str(corte),
+                    str(tinte),
+                    str(ObjectId()),
+                    "no-es-un-id",
+                ],
+                "appointment_date": "2030-01-01T15:00:00",
+            },
+            {
+                "_id": orphan_id,
+                "user_id": str(ObjectId()),
+                "employee_id": "no-es-un-id",
+                "service_ids": [str(corte)],
+                "appointment_date": datetime(2030, 1, 2, 15, tzinfo=timezone.utc),
+                "service_names": ["Nombre guardado"],
+            },
+        ]
+    )
+
+    assert await backfill_appointment_names(restart=True) == 2
+
+    legacy, orphan = fake_db.appointments.docs
+    assert legacy["user_name"] == "Ana Gómez"
+    assert legacy["employee_name"] == "Luis Pérez"
+    assert legacy["service_names"] == [
+        "Tinte",
+        "Corte",
+        "Tinte",
+        "Servicio no encontrado",
+        "Servicio no encontrado",
+    ]
+    assert legacy["total_duration_minutes"] == 150
+    start = datetime(2030, 1, 1, 15, tzinfo=timezone.utc)
+    assert legacy["appointment_date"] == start
+    assert legacy["end_date"] == start + timedelta(minutes=150)
+
+    assert orphan["user_name"] == "Usuario no encontrado"
+    assert orphan["employee_name"] == "Empleado no encontrado"
+    # Los nombres ya guardados no se recalculan
+    assert orphan["service_names"] == ["Nombre guardado"]
+    assert orphan["total_duration_minutes"] == 30
@@ -0,0 +1,94 @@
+import pytest
+
+from tests.conftest import auth_headers, booking, next_tuesday
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def appointment(client, booking_data):
+    employee_id = booking_data["employee_ids"][0]
+    response = await client.post(
+        "/appointments", json=booking(booking_data, employee_id, next_tuesday(10))
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+@pytest.fixture
+def employee_headers(booking_data):
+    return auth_headers("employee", booking_data["employee_ids"][0])
+
+
+async def test_changing_services_updates_names_cost_and_duration(
+    client, fake_db, booking_data, appointment, employee_headers
+):
+    service_ids = [booking_data["service_id"], booking_data["long_service_id"]]
+
+    response = await client.patch(
+        f"/appointments/{appointment['id']}",
+        json={"service_ids": service_ids},
+        headers=employee_headers,
+    )
+
+    assert response.status_code == 200
+    updated = response.json()
+    assert updated["service_names"] == ["Corte", "Tinte"]
+    assert updated["total_cost"] == 70000.0
+    assert updated["total_duration_minutes"] == 90
+    stored = fake_db.appointments.docs[0]
+    assert stored["service_names"] == ["Corte", "Tinte"]
+    assert stored["total_cost"] == 70000.0
+
+
+async def test_unknown_services_are_rejected(
+    client, fake_db, booking_data, appointment, employee_headers
+):
+    unknown_id = "0" * 24
+
+    response = await client.patch(
+        f"/appointments/{appointment['id']}",
+        json={"service_ids": [booking_data["service_id"], unknown_id]},
+        headers=employee_headers,
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"]["unknown_service_ids"] == [unknown_id]
+    assert fake_db.appointments.docs[0]["service_names"] == ["Corte"]
+
+
+def rollup_rows(fake_db, state: str) -> dict:
+    """Documentos del rollup de un estado, por service_id (None = por cita)."""
+    return {
+        row["service_id"]: row
+        for row in fake_db.daily_appointment_stats.docs
+        if row["state"] == state
+    }
+
+
+async def test_changing_services_and_state_moves_the_rollup(
+    client, fake_db, booking_data, appointment, employee_headers
+):
+    service_id, long_service_id = (
+        booking_data["service_id"],
+        booking_data["long_service_id"],
+    )
+
+    response = await client.patch(
+        f"/appointments/{appointment['id']}",
+        json={"service_ids": [service_id, long_service_id], "state": "confirmed"},
+        headers=employee_headers,
+    )
+    assert response.status_code == 200
+
+    pending = rollup_rows(fake_db, "pending")
+    assert pending[None]["appointments"] == 0
+    assert pending[None]["revenue"] == 0
+    assert pending[service_id]["appointments"] == 0
+
+    confirmed = rollup_rows(fake_db, "confirmed")
+    assert confirmed[None]["appointments"] == 1
+    assert confirmed[None]["revenue"] == 70000.0
+    assert confirmed[service_id]["appointments"] == 1
+    assert confirmed[long_service_id]["appointments"] == 1
+    assert confirmed[long_service_id]["service_name"] == "Tinte"
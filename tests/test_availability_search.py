@@ -0,0 +1,56 @@
+import time
+from datetime import timedelta
+
+import pytest
+from bson import ObjectId
+
+from peluqueria.api.utils.availability import search_slots
+from peluqueria.api.utils.date_utils import co_day_bounds, today_co
+
+pytestmark = [pytest.mark.anyio, pytest.mark.benchmark]
+
+EMPLOYEES = 30
+DAYS = 14
+# Requisito de user-024 para la búsqueda sobre los bitmaps ya cargados
+SEARCH_BUDGET_SECONDS = 0.05
+
+
+@pytest.fixture
+def busy_schedule(fake_db):
+    """30 empleados con una cita de 30 minutos cada hora durante 14 días."""
+    employee_ids = [str(ObjectId()) for _ in range(EMPLOYEES)]
+    days = [today_co() + timedelta(days=offset) for offset in range(1, DAYS + 1)]
+    fake_db.appointments.docs.extend(
+        {
+            "_id": ObjectId(),
+            "employee_id": employee_id,
+            "appointment_date": start,
+            "end_date": start + timedelta(minutes=30),
+            "total_duration_minutes": 30,
+            "state": "pending",
+        }
+        for employee_id in employee_ids
+        for day in days
+        for hour in range(9, 20)
+        for start in [co_day_bounds(day)[0] + timedelta(hours=hour)]
+    )
+    return employee_ids, days
+
+
+async def test_search_over_30_employees_and_14_days(busy_schedule):
+    employee_ids, days = busy_schedule
+    # La primera llamada carga los bitmaps en una sola consulta
+    await search_slots(employee_ids, days, 30, limit=10)
+
+    started = time.perf_counter()
+    # Sin límite efectivo la búsqueda recorre todos los días
+    found = await search_slots(employee_ids, days, 30, limit=100_000)
+    elapsed = time.perf_counter() - started
+
+    # Las citas ocupan cada hora en punto; solo quedan libres las medias horas
+    assert len(found) > EMPLOYEES * DAYS
+    assert all(start.minute == 30 for start, _ in found)
+    assert elapsed < SEARCH_BUDGET_SECONDS, (
+        f"{EMPLOYEES} empleados x {DAYS} días: {elapsed * 1000:.1f} ms, "
+        f"{len(found)} horarios"
+    )
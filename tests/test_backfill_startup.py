@@ -0,0 +1,42 @@
+import pytest
+from bson import ObjectId
+
+from peluqueria.api.db.backfill import ensure_backfill
+from tests.conftest import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_legacy_appointments_are_listed_after_startup(client, fake_db):
+    # Cita antigua: sin nombres ni horario y con la fecha guardada como texto
+    fake_db.appointments.docs.append(
+        {
+            "_id": ObjectId(),
+            "user_id": str(ObjectId()),
+            "employee_id": str(ObjectId()),
+            "service_ids": [str(ObjectId())],
+            "appointment_date": "2030-01-01T15:00:00",
+            "created_at": "2029-12-01T15:00:00",
+            "updated_at": "2029-12-01T15:00:00",
+            "state": "pending",
+            "total_cost": 0.0,
+        }
+    )
+
+    await ensure_backfill()
+    response = await client.get(
+        "/appointments",
+        params={"from": "2030-01-01T00:00:00Z"},
+        headers=auth_headers("employee"),
+    )
+
+    assert response.status_code == 200
+    (item,) = response.json()["items"]
+    assert item["user_name"] == "Usuario no encontrado"
+    assert item["service_names"] == ["Servicio no encontrado"]
+
+
+async def test_startup_skips_the_backfill_when_nothing_is_missing(fake_db):
+    await ensure_backfill()
+
+    assert fake_db.round_trips == 1
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from peluqueria.api.utils.business_calendar import business_calendar
+from tests.conftest import auth_headers, booking, next_tuesday
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize(
+    "start",
+    [
+        # Termina a las 20:15, después del cierre de las 20:00
+        next_tuesday(19, 45),
+        # Antes de abrir
+        next_tuesday(8, 30),
+        # Ya pasó
+        datetime.now(timezone.utc) - timedelta(days=1),
+    ],
+)
+async def test_create_outside_business_hours_is_rejected(
+    client, fake_db, booking_data, start
+):
+    response = await client.post(
+        "/appointments",
+        json=booking(booking_data, booking_data["employee_ids"][0], start),
+    )
+
+    assert response.status_code == 422
+    assert fake_db.appointments.docs == []
+    assert fake_db.appointment_slots.docs == []
+
+
+async def test_reschedule_outside_business_hours_is_rejected(
+    client, fake_db, booking_data
+):
+    employee_id = booking_data["employee_ids"][0]
+    created = await client.post(
+        "/appointments", json=booking(booking_data, employee_id, next_tuesday(10))
+    )
+    assert created.status_code == 201
+    slots = [doc["slot_start"] for doc in fake_db.appointment_slots.docs]
+
+    response = await client.patch(
+        f"/appointments/{created.json()['id']}",
+        json={"appointment_date": next_tuesday(19, 45).isoformat()},
+        headers=auth_headers("employee", employee_id),
+    )
+
+    assert response.status_code == 422
+    assert fake_db.appointments.docs[0]["appointment_date"] == next_tuesday(10)
+    assert [doc["slot_start"] for doc in fake_db.appointment_slots.docs] == slots
+
+
+async def test_changing_only_the_state_is_not_checked_against_hours(
+    client, fake_db, booking_data
+):
+    employee_id = booking_data["employee_ids"][0]
+    created = await client.post(
+        "/appointments", json=booking(booking_data, employee_id, next_tuesday(10))
+    )
+    # Un cambio de horario posterior deja la cita fuera del turno
+    fake_db.business_calendar.docs.append(
+        {"_id": "default", "weekly_hours": {}, "holidays": []}
+    )
+    business_calendar.invalidate()
+
+    response = await client.patch(
+        f"/appointments/{created.json()['id']}",
+        json={"state": "confirmed"},
+        headers=auth_headers("employee", employee_id),
+    )
+
+    assert response.status_code == 200
@@ -0,0 +1,28 @@
+import pytest
+from bson import ObjectId
+
+from peluqueria.api.db.indexes import INDEX_REGISTRY, apply_indexes, index_models
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_failing_index_does_not_skip_the_rest(fake_db):
+    # El índice único de email no se puede crear con correos repetidos
+    fake_db.users.docs.extend(
+        {"_id": ObjectId(), "email": "ana@example.com", "role": "customer"}
+        for _ in range(2)
+    )
+
+    await apply_indexes()
+
+    assert "email_1" not in fake_db.users.index_names
+    assert fake_db.users.index_names == [
+        model.document["name"]
+        for model in index_models("users")
+        if model.document["name"] != "email_1"
+    ]
+    for collection in INDEX_REGISTRY:
+        if collection != "users":
+            assert len(fake_db[collection].index_names) == len(
+                INDEX_REGISTRY[collection]
+            )
@@ -0,0 +1,94 @@
+import asyncio
+import statistics
+import time
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+
+from peluqueria.api.utils import user_utils
+from peluqueria.api.utils.utils import hash_password, password_pool, verify_password
+
+pytestmark = [pytest.mark.anyio, pytest.mark.benchmark]
+
+PASSWORD = "secreta123"
+# Por debajo de la capacidad del pool (workers + cola) para que ninguno reciba 503
+CONCURRENT_LOGINS = 16
+GET_INTERVAL = 0.01
+# Con bcrypt en el event loop el p99 llega a varias verificaciones completas
+# (unas CONCURRENT_LOGINS); en el pool queda muy por debajo de una
+SAFETY_FACTOR = 3
+
+
+@pytest.fixture
+def customer(fake_db, monkeypatch):
+    user = {
+        "_id": ObjectId(),
+        "first_name": "Ana",
+        "last_name": "Gómez",
+        "email": "ana@example.com",
+        "phone": "3001234567",
+        "role": "customer",
+        "hashed_password": hash_password(PASSWORD),
+        "created_at": datetime.now(timezone.utc),
+        "updated_at": datetime.now(timezone.utc),
+    }
+    fake_db.users.docs.append(user)
+
+    # La base en memoria no resuelve el $lookup de identities
+    async def find_account_by_email(email: str) -> dict | None:
+        return await fake_db.users.find_one({"email": email})
+
+    monkeypatch.setattr(user_utils, "find_account_by_email", find_account_by_email)
+    return user
+
+
+async def timed_get(client, latencies: list[float], scheduled: float):
+    response = await client.get("/metrics")
+    latencies.append(time.perf_counter() - scheduled)
+    return response
+
+
+def p99(latencies: list[float]) -> float:
+    return statistics.quantiles(latencies, n=100)[98]
+
+
+async def test_login_storm_does_not_block_other_endpoints(client, customer):
+    """Latencia de GET /metrics mientras llegan logins simultáneos.
+
+    Con bcrypt en el event loop cada GET esperaría al menos una verificación
+    completa; en el pool solo espera su turno en el loop.
+    """
+    started = time.perf_counter()
+    verify_password(PASSWORD, customer["hashed_password"])
+    bcrypt_seconds = time.perf_counter() - started
+
+    logins = asyncio.gather(
+        *(
+            client.post(
+                "/auth/login",
+                data={"username": customer["email"], "password": PASSWORD},
+            )
+            for _ in range(CONCURRENT_LOGINS)
+        )
+    )
+    # Un GET cada GET_INTERVAL segundos, medido desde la hora en que tocaba
+    # lanzarlo: si el event loop se bloquea, la espera cuenta como latencia
+    latencies: list[float] = []
+    gets = []
+    first = time.perf_counter()
+    while not logins.done():
+        scheduled = first + len(gets) * GET_INTERVAL
+        await asyncio.sleep(max(scheduled - time.perf_counter(), 0))
+        gets.append(asyncio.create_task(timed_get(client, latencies, scheduled)))
+
+    assert all(response.status_code == 200 for response in await asyncio.gather(*gets))
+    responses = await logins
+    assert [response.status_code for response in responses] == [200] * len(responses)
+    assert p99(latencies) * SAFETY_FACTOR < bcrypt_seconds, (
+        f"{CONCURRENT_LOGINS} logins, {len(latencies)} GET /metrics: "
+        f"p50 {statistics.median(latencies) * 1000:.1f} ms, "
+        f"p99 {p99(latencies) * 1000:.1f} ms, "
+        f"bcrypt {bcrypt_seconds * 1000:.1f} ms, "
+        f"workers {password_pool.max_workers}"
+    )